@@ -1,4 +1,8 @@
+import sys
+import time
+from fractions import Fraction
 import numpy as np
+from dfg import as_matrix
 
 def get_matrix_from_input():
 
@@ -15,6 +19,7 @@ def get_matrix_from_input():
 
 def generate_matrices(L1, m):
 
+    L1 = as_matrix(L1, "weight", -1, "max")
     n = L1.shape[0]
     matrices = [L1]
     
@@ -40,6 +45,71 @@ def generate_matrices(L1, m):
     
     return matrices  
 
+def to_max_plus(L):
+    # -1 "no path" sentinel -> -inf so sums propagate it for free
+    M = np.array(as_matrix(L, "weight", -1, "max"), dtype=float)
+    M[M == -1] = -np.inf
+    return M
+
+def from_max_plus(M):
+    L = np.where(np.isneginf(M), -1, M)
+    return L.astype(int)
+
+def max_plus_product(A, B, block_size=64):
+    """
+    Max-plus product C[i, j] = max_k (A[i, k] + B[k, j]) using broadcasting.
+
+    Rows and the inner index are processed in blocks so only a
+    block_size x block_size x m slab is materialised at a time instead of
+    the full n x n x m intermediate.
+    """
+    n, p = A.shape
+    m = B.shape[1]
+    C = np.full((n, m), -np.inf)
+
+    for i0 in range(0, n, block_size):
+        i1 = min(i0 + block_size, n)
+        for k0 in range(0, p, block_size):
+            k1 = min(k0 + block_size, p)
+            slab = A[i0:i1, k0:k1, None] + B[None, k0:k1, :]
+            np.maximum(C[i0:i1], slab.max(axis=1), out=C[i0:i1])
+
+    return C
+
+def generate_matrices_max_plus(L1, m, block_size=64):
+    # Same output as generate_matrices, computed with max_plus_product
+    A = to_max_plus(L1)
+    L_prev = A
+    matrices = [from_max_plus(A)]
+
+    for _ in range(m):
+        L_prev = max_plus_product(A, L_prev, block_size)
+        matrices.append(from_max_plus(L_prev))
+
+    return matrices
+
+def benchmark_generate_matrices(sizes=(8, 16, 32, 64), m=4, density=0.3, seed=0):
+    rng = np.random.default_rng(seed)
+    print(f"{'n':>5} | {'loop (s)':>10} | {'max-plus (s)':>12} | {'speedup':>8}")
+    print("-" * 46)
+
+    for n in sizes:
+        L1 = rng.integers(0, 10, size=(n, n))
+        L1[rng.random((n, n)) > density] = -1
+
+        start = time.perf_counter()
+        reference = generate_matrices(L1, m)
+        t_loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fast = generate_matrices_max_plus(L1, m)
+        t_fast = time.perf_counter() - start
+
+        if not all(np.array_equal(a, b) for a, b in zip(reference, fast)):
+            raise AssertionError(f"max-plus engine disagrees with loop for n={n}")
+
+        print(f"{n:>5} | {t_loop:>10.4f} | {t_fast:>12.4f} | {t_loop / t_fast:>7.1f}x")
+
 def compute_iteration_bound(matrices):
     n = matrices[0].shape[0]
     bound_values = []
@@ -55,6 +125,68 @@ def compute_iteration_bound(matrices):
     print("\nFinal Iteration Bound:", iteration_bound)
     return iteration_bound
 
+def compute_iteration_bound_streaming(L1, block_size=64):
+    """
+    Iteration bound without storing L^(1..m).
+
+    Only the current matrix and the running max of L^(t)[i,i]/t are kept.
+    Stops at t = n (a simple cycle visits at most n nodes) or as soon as
+    no walks of length t are left.
+    """
+    A = to_max_plus(L1)
+    n = A.shape[0]
+    L = A
+    best = -np.inf
+
+    for t in range(1, n + 1):
+        diag = np.diagonal(L)
+        if np.isfinite(diag).any():
+            best = max(best, diag.max() / t)
+        if t == n or np.isneginf(L).all():
+            break
+        L = max_plus_product(A, L, block_size)
+
+    return float(best) if best != -np.inf else -1
+
+def has_positive_cycle(A, lam, block_size=64):
+    # Closure of (A - lam) over walks of length <= n via repeated squaring
+    n = A.shape[0]
+    C = A - lam
+    np.fill_diagonal(C, np.maximum(np.diagonal(C), 0))
+    steps = 1
+    while steps < n:
+        C = max_plus_product(C, C, block_size)
+        steps *= 2
+    return bool((np.diagonal(C) > 1e-9).any())
+
+def compute_iteration_bound_squaring(L1, block_size=64):
+    """
+    Iteration bound from O(log n) squarings per probe.
+
+    Bisects on lam with has_positive_cycle until the bracket is narrower
+    than the gap between cycle means (denominators <= n), then snaps to
+    the exact fraction.
+    """
+    A = to_max_plus(L1)
+    n = A.shape[0]
+    finite = A[np.isfinite(A)]
+    if finite.size == 0:
+        return -1
+
+    lo = finite.min() - 1
+    hi = finite.max()
+    if not has_positive_cycle(A, lo, block_size):
+        return -1
+
+    while hi - lo >= 1 / (2 * n * n):
+        mid = (lo + hi) / 2
+        if has_positive_cycle(A, mid, block_size):
+            lo = mid
+        else:
+            hi = mid
+
+    return float(Fraction(hi).limit_denominator(n))
+
 def print_matrices(matrices):
     for idx, matrix in enumerate(matrices, start=2):
         print(f"\nMatrix L{idx-1}:")
@@ -62,10 +194,20 @@ def print_matrices(matrices):
             print(" ".join(map(str, row)))
 
 if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark_generate_matrices()
+        sys.exit(0)
+
     L1 = get_matrix_from_input()
-    m = int(input("Enter the number of matrices to generate (m): "))
+    m_input = input("Enter the number of matrices to generate (m, or press Enter to stream): ")
+
+    if not m_input.strip():
+        print("\nIteration Bound:", compute_iteration_bound_streaming(L1))
+        sys.exit(0)
+
+    m = int(m_input)
     
-    matrices = generate_matrices(L1, m)
+    matrices = generate_matrices_max_plus(L1, m)
     print_matrices(matrices)
     
     iteration_bound = compute_iteration_bound(matrices)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# Single entry point over the analyses. Only argparse is imported at startup:
+# each subcommand imports its module (and NumPy, sympy or pandas) when it runs,
+# and `cli.py startup` tracks the import cost of every subcommand.
+import argparse
+import sys
+
+def read_edges(args):
+    # --edge I J W triples as ints when integral, floats otherwise
+    return [tuple(int(float(v)) if float(v).is_integer() else float(v) for v in edge) for edge in args.edge or []]
+
+def run_mcm(args):
+    from Minimum_Cycle_Mean_Algorithm import iteration_bound_scc
+
+    T, component, cycle = iteration_bound_scc(args.nodes, read_edges(args), method=args.method)
+    print(f"Iteration bound: {T}")
+    print(f"Critical component: {component}")
+    print(f"Critical cycle: {cycle}")
+
+def run_lpm(args):
+    import numpy as np
+    from Longest_Path_Matrix import compute_iteration_bound_streaming
+
+    L1 = np.loadtxt(args.matrix, dtype=int, ndmin=2)
+    print(f"Iteration bound: {compute_iteration_bound_streaming(L1)}")
+
+def run_retime(args):
+    from floyd_washall_algorithm_crit_path import minimize_clock_period
+
+    c, r = minimize_clock_period(len(args.times), read_edges(args), args.times)
+    print(f"Minimum clock period: {c}")
+    print(f"Retiming: {[int(v) for v in r]}")
+
+def run_unfold(args):
+    from unfolding_sample_periods import parse_fraction, find_j_for_sample_period
+
+    find_j_for_sample_period(parse_fraction(args.Tc), parse_fraction(args.Tclk), args.max_j)
+
+def run_cook_toom(args):
+    import cook_toom
+
+    cook_toom.main(args.rest)
+
+def run_modified(args):
+    from modified_cook_toom import modified_toom_cook, print_matrices
+
+    print_matrices(modified_toom_cook(args.l, args.m, args.beta, cache=not args.no_cache), args.l, args.m)
+
+def run_convolve(args):
+    import numpy as np
+    from cook_toom_engine import cook_toom_convolve
+
+    print(cook_toom_convolve(np.array(args.x), np.array(args.h))[0])
+
+def run_points(args):
+    from point_search import candidate_values, print_front, search_points
+
+    front, stats = search_points(args.l, args.m, candidate_values(args.max_int, args.max_den),
+                                 args.max_magnitude, args.workers)
+    print(f"{stats['sets']} point sets, {stats['pruned']} pruned, {len(front)} on the Pareto front\n")
+    print_front(front)
+
+def run_nested(args):
+    from nested_convolution import NestedConvolution, plan_sizes, print_counts
+
+    print_counts(NestedConvolution(args.sizes or plan_sizes(args.taps), args.kind))
+
+def run_fir(args):
+    from streaming_fir import filter_file
+
+    stats = filter_file(args.input, args.output, args.h, chunk=args.chunk, block=args.block,
+                        method=args.method, kernel=args.kernel)
+    stats.report()
+
+def run_bench(args):
+    import convolution_benchmark as bench
+
+    rows = bench.run_benchmark(args.L, args.N, args.variants, args.batch, repeat=args.repeat)
+    bench.print_rows(rows)
+    if args.csv:
+        bench.write_csv(rows, args.csv)
+    if args.json:
+        bench.write_json(rows, args.json)
+
+def run_subsector(args):
+    import subsector_sharing
+
+    coeffs = args.coeffs or subsector_sharing.binary_coeffs
+    A = subsector_sharing.share_subexpressions(subsector_sharing.coefficient_matrix(coeffs), verbose=not args.quiet)
+    subsector_sharing.print_final_matrix(A, max(len(b) for b in coeffs))
+
+def import_time_us(command):
+    # Sum of the "self" column of -X importtime, in microseconds
+    import subprocess
+
+    result = subprocess.run([sys.executable, "-X", "importtime"] + command, capture_output=True, text=True)
+    total = 0
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            field = line.split(":", 1)[1].split("|")[0].strip()
+            if field.isdigit():
+                total += int(field)
+    return total
+
+def run_startup(args):
+    """
+    Startup cost per subcommand, best of --repeat runs.
+
+    "cli" is the bare entry point (`cli.py --help`), every other row is the
+    import of the module a subcommand loads, measured with -X importtime
+    (sum of the self column) and as wall-clock interpreter time.
+    """
+    import json
+    import os
+    import subprocess
+    import time
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    commands = {"cli": [os.path.join(here, "cli.py"), "--help"]}
+    for name, module in sorted(MODULES.items()):
+        commands[name] = ["-c", f"import sys; sys.path.insert(0, {here!r}); import {module}"]
+
+    rows = []
+    for name, command in commands.items():
+        imports, wall = [], []
+        for _ in range(args.repeat):
+            imports.append(import_time_us(command))
+            start = time.perf_counter()
+            subprocess.run([sys.executable] + command, capture_output=True)
+            wall.append(time.perf_counter() - start)
+        rows.append({"command": name, "import_ms": min(imports) / 1000, "wall_ms": min(wall) * 1000})
+
+    print(f"{'command':<10} | {'imports (ms)':>12} | {'wall (ms)':>9}")
+    print("-" * 38)
+    for row in rows:
+        print(f"{row['command']:<10} | {row['import_ms']:>12.1f} | {row['wall_ms']:>9.1f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+SUBCOMMANDS = {
+    "mcm": run_mcm,
+    "lpm": run_lpm,
+    "retime": run_retime,
+    "unfold": run_unfold,
+    "cook-toom": run_cook_toom,
+    "modified": run_modified,
+    "points": run_points,
+    "convolve": run_convolve,
+    "nested": run_nested,
+    "fir": run_fir,
+    "bench": run_bench,
+    "subsector": run_subsector,
+}
+
+# Module each subcommand imports, for the startup benchmark
+MODULES = {
+    "mcm": "Minimum_Cycle_Mean_Algorithm",
+    "lpm": "Longest_Path_Matrix",
+    "retime": "floyd_washall_algorithm_crit_path",
+    "unfold": "unfolding_sample_periods",
+    "cook-toom": "cook_toom",
+    "modified": "modified_cook_toom",
+    "points": "point_search",
+    "convolve": "cook_toom_engine",
+    "nested": "nested_convolution",
+    "fir": "streaming_fir",
+    "bench": "convolution_benchmark",
+    "subsector": "subsector_sharing",
+}
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Data-flow graph and fast convolution analyses")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("mcm", help="iteration bound by minimum cycle mean (1-indexed edges)")
+    p.add_argument("--nodes", type=int, required=True)
+    p.add_argument("--edge", nargs=3, action="append", metavar=("I", "J", "W"))
+    p.add_argument("--method", choices=("auto", "karp", "howard"), default="auto")
+
+    p = sub.add_parser("lpm", help="iteration bound from a longest path matrix file")
+    p.add_argument("matrix", help="whitespace separated rows, -1 for no path")
+
+    p = sub.add_parser("retime", help="minimum clock period retiming (0-indexed edges with delays)")
+    p.add_argument("--times", type=float, nargs="+", required=True, help="execution time per node")
+    p.add_argument("--edge", nargs=3, action="append", metavar=("U", "V", "W"))
+
+    p = sub.add_parser("unfold", help="unfolding factor j for a sample period")
+    p.add_argument("Tc", help="iteration bound, fractions allowed")
+    p.add_argument("Tclk", help="clock period")
+    p.add_argument("--max-j", type=int, default=100)
+
+    p = sub.add_parser("cook-toom", help="symbolic Cook–Toom matrices (arguments of cook_toom.py)", add_help=False)
+
+    p = sub.add_parser("modified", help="modified Toom–Cook matrices")
+    p.add_argument("l", type=int)
+    p.add_argument("m", type=int)
+    p.add_argument("beta", type=int, nargs="+")
+    p.add_argument("--no-cache", action="store_true")
+
+    p = sub.add_parser("points", help="Pareto search of modified Toom–Cook evaluation points")
+    p.add_argument("l", type=int)
+    p.add_argument("m", type=int)
+    p.add_argument("--max-int", type=int, default=3, help="largest integer point")
+    p.add_argument("--max-den", type=int, default=3, help="largest denominator of ±1/k points")
+    p.add_argument("--max-magnitude", type=int, help="discard sets with larger coefficients")
+    p.add_argument("--workers", type=int)
+
+    p = sub.add_parser("convolve", help="convolve x with h through the numeric Cook–Toom engine")
+    p.add_argument("--x", type=int, nargs="+", required=True)
+    p.add_argument("--h", type=int, nargs="+", required=True)
+
+    p = sub.add_parser("nested", help="multiply/add counts of a nested Cook–Toom convolution")
+    p.add_argument("taps", type=int)
+    p.add_argument("--sizes", type=int, nargs="+", help="level sizes, innermost first (planned if omitted)")
+    p.add_argument("--kind", choices=("cook_toom", "modified"), default="cook_toom")
+
+    p = sub.add_parser("fir", help="stream a raw float64 sample file through a fast-convolution FIR")
+    p.add_argument("input")
+    p.add_argument("output")
+    p.add_argument("--h", type=float, nargs="+", required=True, help="filter taps")
+    p.add_argument("--block", type=int, help="output samples per block (number of taps by default)")
+    p.add_argument("--chunk", type=int, default=1 << 16)
+    p.add_argument("--method", choices=("overlap-add", "overlap-save"), default="overlap-add")
+    p.add_argument("--kernel", choices=("cook_toom", "nested", "modified"), default="nested")
+
+    p = sub.add_parser("bench", help="operation counts and runtime of the convolution variants")
+    p.add_argument("--L", type=int, nargs="+", default=[2, 3, 4, 6], help="block lengths of x")
+    p.add_argument("--N", type=int, nargs="+", default=[2, 3, 4], help="filter lengths")
+    p.add_argument("--variants", nargs="+", choices=("cook_toom", "modified", "straight_line", "lagrange", "direct"),
+                   default=["cook_toom", "modified", "straight_line", "lagrange", "direct"])
+    p.add_argument("--batch", type=int, default=20000)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--csv", help="write the results to this CSV file")
+    p.add_argument("--json", help="write the results to this JSON file")
+
+    p = sub.add_parser("subsector", help="subexpression sharing of binary coefficients")
+    p.add_argument("coeffs", nargs="*", help="binary strings (the 8-coefficient example if omitted)")
+    p.add_argument("--quiet", action="store_true", help="only print the final matrix")
+
+    p = sub.add_parser("startup", help="benchmark startup and import time of every subcommand")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--json", help="write the results to this file")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    # cook-toom forwards its options to cook_toom.py's own parser
+    if args.command == "cook-toom":
+        args.rest = rest
+    elif rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+
+    if args.command == "startup":
+        run_startup(args)
+    else:
+        SUBCOMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    main()
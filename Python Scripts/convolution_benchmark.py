@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import numpy as np
+from cook_toom_engine import CookToomEngine, ModifiedEngine, default_points
+
+VARIANTS = ("cook_toom", "modified", "straight_line", "lagrange", "direct")
+
+def count_nonzero_additions(M):
+    # count_additions rule: a row with k nonzeros costs k-1 additions
+    return sum(max(sum(1 for c in row if c != 0) - 1, 0) for row in M.tolist())
+
+def count_constant_multiplications(M):
+    # Matrix entries other than 0/±1 are multiplications by a constant
+    return sum(1 for row in M.tolist() for c in row if c not in (0, 1, -1))
+
+def best_time(fn, repeat):
+    # Best wall-clock seconds of repeat calls, and the last result
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def direct_convolve(X, h):
+    # Shift-and-add over the taps, one vectorized pass per tap for the whole batch
+    Y = np.zeros((X.shape[0], X.shape[1] + h.size - 1), dtype=np.result_type(X, h))
+    for k, c in enumerate(h):
+        Y[:, k:k + X.shape[1]] += c * X
+    return Y
+
+def load_lagrange():
+    # ct.py lives at the repository root, next to this directory
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from ct import lagrange_convolve
+    return lagrange_convolve
+
+def prepare(variant, L, N):
+    """
+    Derivation of one variant for (L, N).
+
+    Matrix variants are derived once without the on-disk cache, so derive_ms
+    is the cost of a fresh derivation (sympy's own in-memory cache aside).
+
+    Returns:
+    tuple: (derive seconds, operation counts, convolve(X, h) function)
+    """
+    m = L + N - 1
+    if variant == "cook_toom":
+        from cook_toom import derive_matrices
+
+        beta = default_points(m)
+        seconds, _ = best_time(lambda: derive_matrices(L, N, [str(b) for b in beta], cache=False), 1)
+        engine = CookToomEngine(L, N, beta)
+        counts = {
+            "multiplications": engine.multiplications,
+            "constant_multiplications": count_constant_multiplications(engine.B) + count_constant_multiplications(engine.G),
+            "pre_additions": count_nonzero_additions(engine.B),
+            "post_additions": count_nonzero_additions(engine.G),
+        }
+        return seconds, counts, engine.convolve
+    if variant == "modified":
+        from modified_cook_toom import modified_toom_cook
+
+        beta = [int(b) if b.denominator == 1 else b for b in default_points(m - 1)]
+        seconds, result = best_time(lambda: modified_toom_cook(L, N, beta, cache=False), 1)
+        engine = ModifiedEngine(L, N, beta, result)
+        counts = {
+            "multiplications": engine.multiplications,
+            "constant_multiplications": count_constant_multiplications(engine.B) + count_constant_multiplications(engine.G),
+            "pre_additions": count_nonzero_additions(engine.B),
+            "post_additions": count_nonzero_additions(engine.G),
+        }
+        return seconds, counts, engine.convolve
+    if variant == "straight_line":
+        from kernel_codegen import StraightLineKernel
+        from modified_cook_toom import modified_toom_cook
+
+        # Generated from the modified Toom–Cook matrices, derive_ms includes the code generation.
+        # Timed through apply=, since kernel.convolve sends float batches to the matmul chain
+        beta = [int(b) if b.denominator == 1 else b for b in default_points(m - 1)]
+        derive = lambda: StraightLineKernel(ModifiedEngine(L, N, beta, modified_toom_cook(L, N, beta, cache=False)))
+        seconds, kernel = best_time(derive, 1)
+        counts = {key: kernel.counts[key] for key in
+                  ("multiplications", "constant_multiplications", "pre_additions", "post_additions")}
+        return seconds, counts, lambda X, h: kernel.engine.convolve(X, h, apply=kernel.apply)
+    if variant == "lagrange":
+        lagrange_convolve = load_lagrange()
+        points = [float(b) for b in default_points(m)]
+        # Horner evaluation of x and h at m points, then m dense length-m basis
+        # polynomials scaled and summed; nothing is derived ahead of time
+        counts = {
+            "multiplications": m,
+            "constant_multiplications": m * (L - 1 + N - 1) + m * m,
+            "pre_additions": m * (L - 1 + N - 1),
+            "post_additions": (m - 1) * m,
+        }
+        return 0.0, counts, lambda X, h: np.array([lagrange_convolve(x, h, points) for x in X])
+    if variant == "direct":
+        counts = {
+            "multiplications": L * N,
+            "constant_multiplications": 0,
+            "pre_additions": 0,
+            "post_additions": (L - 1) * (N - 1),
+        }
+        return 0.0, counts, direct_convolve
+    raise ValueError(f"Unknown variant '{variant}', expected one of {', '.join(VARIANTS)}")
+
+def run_benchmark(lengths=(2, 3, 4, 6), taps=(2, 3, 4), variants=VARIANTS, batch=20000,
+                  lagrange_batch=200, repeat=3, seed=0):
+    """
+    Sweep L (block length) and N (taps) over the convolution variants.
+
+    Every variant is first checked on a random integer batch against
+    np.convolve (exact equality for the integer variants, max error for the
+    float Lagrange one), then timed on a random float batch.
+
+    Returns:
+    list: One dict per (variant, L, N) with counts, derive_ms,
+    blocks_per_second, exact and max_error
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for L in lengths:
+        for N in taps:
+            X_int = rng.integers(-8, 8, (64, L))
+            h_int = rng.integers(-8, 8, N)
+            reference = np.array([np.convolve(x, h_int) for x in X_int])
+            X = rng.standard_normal((batch, L))
+            h = rng.standard_normal(N)
+            for variant in variants:
+                seconds, counts, convolve = prepare(variant, L, N)
+                Y = convolve(X_int, h_int)
+                size = lagrange_batch if variant == "lagrange" else batch
+                run, _ = best_time(lambda: convolve(X[:size], h), repeat)
+                row = {"variant": variant, "L": L, "N": N}
+                row.update(counts)
+                row["additions"] = counts["pre_additions"] + counts["post_additions"]
+                row.update({
+                    "derive_ms": seconds * 1e3,
+                    "blocks_per_second": size / run,
+                    "exact": bool(np.array_equal(Y, reference)),
+                    "max_error": float(np.abs(Y - reference).max()),
+                })
+                rows.append(row)
+    return rows
+
+def best_by_size(rows):
+    # Fastest correct variant per (L, N), for picking an algorithm per filter size
+    best = {}
+    for row in rows:
+        key = (row["L"], row["N"])
+        if row["max_error"] < 1e-6 and (key not in best or row["blocks_per_second"] > best[key]["blocks_per_second"]):
+            best[key] = row
+    return best
+
+def write_csv(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def write_json(rows, path):
+    with open(path, "w") as f:
+        json.dump(rows, f, indent=2)
+
+def print_rows(rows):
+    print("blocks/s are measured on float64 blocks. straight_line forces the generated kernel; its")
+    print("convolve() uses it for integer inputs only, as on float64 it trails from about L = N = 4 on\n")
+    print(f"{'variant':<13} | {'L':>2} | {'N':>2} | {'mult':>4} | {'const':>5} | {'add':>4} | "
+          f"{'derive ms':>9} | {'blocks/s':>11} | {'max error':>9}")
+    print("-" * 85)
+    for row in rows:
+        print(f"{row['variant']:<13} | {row['L']:>2} | {row['N']:>2} | {row['multiplications']:>4} | "
+              f"{row['constant_multiplications']:>5} | {row['additions']:>4} | {row['derive_ms']:>9.2f} | "
+              f"{row['blocks_per_second']:>11.0f} | {row['max_error']:>9.2e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Operation counts and runtime of the fast convolution variants")
+    parser.add_argument('--L', type=int, nargs='+', default=[2, 3, 4, 6], help="block lengths of x")
+    parser.add_argument('--N', type=int, nargs='+', default=[2, 3, 4], help="filter lengths")
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument('--batch', type=int, default=20000, help="blocks per timed batch")
+    parser.add_argument('--lagrange-batch', type=int, default=200, help="blocks per batch for the per-block Lagrange loop")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--csv', help="write the results to this CSV file")
+    parser.add_argument('--json', help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.L, args.N, args.variants, args.batch, args.lagrange_batch, args.repeat)
+    print_rows(rows)
+    print("\nFastest variant per size:")
+    for (L, N), row in sorted(best_by_size(rows).items()):
+        print(f"  L={L}, N={N}: {row['variant']}")
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.json:
+        write_json(rows, args.json)
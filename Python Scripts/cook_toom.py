@@ -1,8 +1,85 @@
 #!/usr/bin/env python3
 import argparse
 import sympy as sp
+import derivation_cache
+
+def to_sympy(rows):
+    return sp.Matrix([[sp.Rational(c.numerator, c.denominator) for c in row] for row in rows])
+
+def load_matrices(L, N, beta):
+    # (B, B_h, G_int, scale) from the on-disk cache, None on a miss
+    payload = derivation_cache.load("cook_toom", (L, N), beta)
+    if payload is None:
+        return None
+    return (to_sympy(derivation_cache.from_rational_rows(payload["B"])),
+            to_sympy(derivation_cache.from_rational_rows(payload["B_h"])),
+            to_sympy(derivation_cache.from_rational_rows(payload["G_int"])),
+            payload["scale"])
+
+def store_matrices(L, N, beta, B, B_h, G_int, scale):
+    payload = {
+        "B": derivation_cache.to_rational_rows(B),
+        "B_h": derivation_cache.to_rational_rows(B_h),
+        "G_int": derivation_cache.to_rational_rows(G_int),
+        "scale": int(scale),
+    }
+    derivation_cache.store("cook_toom", (L, N), beta, payload)
+
+def derive_matrices(L, N, beta, cache=True):
+    """
+    Cook–Toom matrices for an L-point x and an N-point h at the points beta.
+
+    Same construction as main() without the printing: s = G · diag(B_h·h) · B · x
+    with B (m×L) and B_h (m×N) Vandermonde in beta and G (m×m) the Lagrange
+    interpolation matrix, G = G_int / scale.
+
+    Results are kept in the on-disk derivation cache unless cache=False.
+
+    Returns:
+    tuple: (B, B_h, G_int, scale) as sympy matrices and an integer scale
+    """
+    p = sp.symbols('p')
+    beta = [sp.Rational(b) for b in beta]
+    m = L + N - 1
+    if len(beta) != m:
+        raise ValueError(f"Expected {m} β's, got {len(beta)}")
+    if len(set(beta)) != m:
+        raise ValueError("Evaluation points must be distinct")
+    if cache:
+        cached = load_matrices(L, N, beta)
+        if cached is not None:
+            return cached
+
+    B = sp.Matrix([[b**j for j in range(L)] for b in beta])
+    B_h = sp.Matrix([[b**j for j in range(N)] for b in beta])
+
+    G = sp.zeros(m, m)
+    for i, bi in enumerate(beta):
+        num, den = sp.Integer(1), sp.Integer(1)
+        for bj in beta:
+            if bj != bi:
+                num *= (p - bj)
+                den *= (bi - bj)
+        for (k,), c in sp.Poly(sp.expand(num / den), p).terms():
+            G[k, i] = c
+
+    scale = sp.ilcm(*[sp.denom(c) for c in G], 1)
+    if cache:
+        store_matrices(L, N, beta, B, B_h, G * scale, scale)
+    return B, B_h, G * scale, int(scale)
+
+def print_convolution_matrices(B, D_frac, G_int, scale):
+    print("\n5) Matrices for convolution:")
+    print("   [s_0…s_d]^T = G_int · D_frac · B · [x_0…x_{L-1}]^T\n")
+    print("   Pre‑processing B:")
+    sp.pprint(B)
+    print("\n   Diagonal eval‑matrix D_frac:")
+    sp.pprint(D_frac)
+    print(f"\n   Integer post‑process G_int (scale={scale}):")
+    sp.pprint(G_int)
+    print()
 
-def main():
+def main(argv=None):
     # Symbol for polynomial variable
     p = sp.symbols('p')
 
@@ -16,7 +93,9 @@ def main():
                         help="length of h(p) (degree ≤ N-1)")
     parser.add_argument('--beta', type=float, nargs='+', required=True,
                         help="evaluation points β₀ … β_{L+N-2}")
-    args = parser.parse_args()
+    parser.add_argument('--no-cache', action='store_true',
+                        help="derive from scratch with steps 1-4 printed, leaving the on-disk cache alone")
+    args = parser.parse_args(argv)
 
     L, N = args.L, args.N
     print(f"[DEBUG] L = {L}, N = {N}")
@@ -32,6 +111,17 @@ def main():
     x_syms = sp.symbols(f'x0:{L}')
     h_syms = sp.symbols(f'h0:{N}')
 
+    # A cached derivation skips steps 1-4 and prints only the matrices;
+    # --no-cache derives again with the full output
+    cached = None if args.no_cache else load_matrices(L, N, beta)
+    if cached is not None:
+        B, B_h, G_int, scale = cached
+        print(f"[DEBUG] Loaded B, G_int and scale = {scale} from the derivation cache")
+        print("[DEBUG] Steps 1-4 skipped, run with --no-cache for the full derivation")
+        D_frac = sp.diag(*[val / scale for val in B_h * sp.Matrix(h_syms)])
+        print_convolution_matrices(B, D_frac, G_int, scale)
+        return
+
     # 1) Define polynomials
     x = sum(x_syms[j]*p**j for j in range(L))
     print(f"[DEBUG] x(p) = {x}")
@@ -122,15 +212,10 @@ def main():
     D_frac = sp.diag(*[sp.simplify(val/scale) for val in h_eval])
     print("[DEBUG] Diagonal matrix D_frac created")
 
-    print("\n5) Matrices for convolution:")
-    print("   [s_0…s_d]^T = G_int · D_frac · B · [x_0…x_{L-1}]^T\n")
-    print("   Pre‑processing B:")
-    sp.pprint(B)
-    print("\n   Diagonal eval‑matrix D_frac:")
-    sp.pprint(D_frac)
-    print(f"\n   Integer post‑process G_int (scale={scale}):")
-    sp.pprint(G_int)
-    print()
+    if not args.no_cache:
+        B_h = sp.Matrix([[b**j for j in range(N)] for b in beta])
+        store_matrices(L, N, beta, B, B_h, G_int, scale)
+    print_convolution_matrices(B, D_frac, G_int, scale)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+import argparse
+import time
+from fractions import Fraction
+from math import lcm
+import numpy as np
+import derivation_cache
+
+def default_points(m):
+    # 0, ±1, ±1/2, ±2, ±1/3, ±3, ... small values keep the matrices well conditioned
+    points = [Fraction(0)]
+    k = 1
+    while len(points) < m:
+        for b in (Fraction(k), Fraction(-k), Fraction(1, k + 1), Fraction(-1, k + 1)):
+            if b not in points:
+                points.append(b)
+        k += 1
+    return points[:m]
+
+def integer_rows(M):
+    # Rational matrix (sympy or rows of Fractions) -> (int64 array, scale) with M = array / scale
+    rows = [[Fraction(str(c)) for c in row] for row in (M.tolist() if hasattr(M, "tolist") else M)]
+    scale = lcm(*[c.denominator for row in rows for c in row], 1)
+    values = [[int(c * scale) for c in row] for row in rows]
+    # Many far-apart points overflow int64, keep those as Python integers
+    fits = max((abs(v) for row in values for v in row), default=0) < 2 ** 63
+    return np.array(values, dtype=np.int64 if fits else object), scale
+
+def exact_matrices(L, N, beta):
+    # (B, B_h, G_int, scale); a cache hit needs no sympy, a miss derives through cook_toom
+    payload = derivation_cache.load("cook_toom", (L, N), beta)
+    if payload is not None:
+        return (derivation_cache.from_rational_rows(payload["B"]),
+                derivation_cache.from_rational_rows(payload["B_h"]),
+                derivation_cache.from_rational_rows(payload["G_int"]),
+                payload["scale"])
+    from cook_toom import derive_matrices
+    return derive_matrices(L, N, [str(b) for b in beta])
+
+class CookToomEngine:
+    """
+    Numeric Cook–Toom convolution for fixed (L, N, β).
+
+    The exact matrices of cook_toom.derive_matrices are turned into
+    integer arrays once, s = G_int · diag(B_h·h) · B · x / scale, and the
+    single division by the combined integer scale is done last, so integer
+    signals convolve exactly.
+    """
+    def __init__(self, L, N, beta=None):
+        beta = default_points(L + N - 1) if beta is None else [Fraction(b) for b in beta]
+        self.L, self.N, self.beta = L, N, tuple(beta)
+        B, B_h, G_int, g_scale = exact_matrices(L, N, beta)
+        self.B, b_scale = integer_rows(B)
+        self.B_h, h_scale = integer_rows(B_h)
+        self.G, _ = integer_rows(G_int)
+        self.scale = g_scale * b_scale * h_scale
+        self.multiplications = len(beta)
+
+    def transform_filter(self, h):
+        # h(β_i) for one filter (N,) or a batch of filters (batch, N)
+        return np.asarray(h) @ self.B_h.T
+
+    def magnitude_bound(self, X, h):
+        # Upper bound on any intermediate value from the largest absolute row sums
+        norm = lambda M: int(np.abs(M).sum(axis=1).max())
+        return int(np.abs(X).max(initial=0)) * int(np.abs(h).max(initial=0)) * norm(self.B) * norm(self.B_h) * norm(self.G)
+
+    def convolve(self, X, h, apply=None):
+        """
+        Linear convolution of every row of X (batch, L) with h (N,) or (batch, N).
+
+        apply(X, H) replaces the matrix chain G·(H ⊙ B·x) on the same integer
+        matrices, e.g. a kernel_codegen straight-line kernel.
+
+        Returns:
+        array: (batch, L + N - 1), integer when X and h are integer
+        """
+        X, h = np.asarray(X), np.asarray(h)
+        exact = np.issubdtype(X.dtype, np.integer) and np.issubdtype(h.dtype, np.integer)
+        if not exact:
+            X, h = X.astype(float), h.astype(float)
+        elif max(self.magnitude_bound(X, h), self.scale) >= 2 ** 62:
+            # Exact result needs more than int64: fall back to Python integers
+            X, h = X.astype(object), h.astype(object)
+
+        # Pre-addition, pointwise products, post-addition: one matmul chain for the batch
+        H = self.transform_filter(h)
+        Y = ((X @ self.B.T) * H) @ self.G.T if apply is None else apply(X, H)
+        if not exact:
+            return Y / self.scale
+        # The convolution itself fits in int64 even when the intermediates did not
+        return (Y // self.scale).astype(np.int64)
+
+class ModifiedEngine(CookToomEngine):
+    """
+    Numeric modified Toom–Cook convolution for fixed (L, N, β).
+
+    Same integer matrix chain as CookToomEngine, on the L+N-2 points of
+    modified_toom_cook plus the highest coefficient x_(L-1)·h_(N-1).
+    """
+    def __init__(self, L, N, beta=None, result=None):
+        from modified_cook_toom import modified_toom_cook
+
+        beta = default_points(L + N - 2) if beta is None else [Fraction(b) for b in beta]
+        self.L, self.N, self.beta = L, N, tuple(beta)
+        if result is None:
+            result = modified_toom_cook(L, N, [int(b) if b.denominator == 1 else b for b in beta])
+        B_h = [[b ** j for j in range(N)] for b in beta] + [[0] * (N - 1) + [1]]
+        self.B, b_scale = integer_rows(result['x_transform'])
+        self.B_h, h_scale = integer_rows(B_h)
+        self.G, _ = integer_rows(result['postprocessing'])
+        self.scale = int(result['scaling_factor']) * b_scale * h_scale
+        self.multiplications = len(beta) + 1
+
+engines = {}
+
+def get_engine(L, N, beta=None):
+    # Derive once per (L, N, β) and keep the numeric matrices for the session
+    beta = default_points(L + N - 1) if beta is None else [Fraction(b) for b in beta]
+    key = (L, N, tuple(beta))
+    if key not in engines:
+        engines[key] = CookToomEngine(L, N, beta)
+    return engines[key]
+
+def cook_toom_convolve(X, h, beta=None):
+    # Batched Cook–Toom convolution of the rows of X with h through the cached engine
+    X = np.atleast_2d(X)
+    return get_engine(X.shape[1], np.shape(h)[-1], beta).convolve(X, h)
+
+def benchmark(block_sizes=(2, 3, 4, 6, 8), N=3, batch=20000, repeat=3):
+    """
+    Blocks per second of the engine against a np.convolve loop, per block size.
+
+    Every result is checked against np.convolve before timing.
+    """
+    rng = np.random.default_rng(0)
+    h = rng.standard_normal(N)
+    print(f"{'L':>3} | {'engine blocks/s':>16} | {'np.convolve blocks/s':>20} | {'max error':>9}")
+    print("-" * 58)
+    for L in block_sizes:
+        X = rng.standard_normal((batch, L))
+        engine = get_engine(L, N)
+        reference = np.array([np.convolve(x, h) for x in X])
+        error = np.abs(engine.convolve(X, h) - reference).max()
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            engine.convolve(X, h)
+        fast = repeat * batch / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for x in X:
+            np.convolve(x, h)
+        direct = batch / (time.perf_counter() - start)
+        print(f"{L:>3} | {fast:>16.0f} | {direct:>20.0f} | {error:>9.2e}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Cached numeric Cook–Toom convolution")
+    parser.add_argument('--L', type=int, default=2, help="block length of x")
+    parser.add_argument('--N', type=int, default=3, help="length of h")
+    parser.add_argument('--bench', action='store_true', help="benchmark against np.convolve")
+    args = parser.parse_args()
+
+    engine = get_engine(args.L, args.N)
+    print(f"β = {[str(b) for b in engine.beta]}, scale = {engine.scale}, multiplications = {engine.multiplications}")
+    x = np.arange(1, args.L + 1)
+    h = np.arange(1, args.N + 1)
+    print(f"x = {x}, h = {h}")
+    print(f"Cook–Toom:   {engine.convolve(x[None, :], h)[0]}")
+    print(f"np.convolve: {np.convolve(x, h)}")
+
+    if args.bench:
+        print()
+        benchmark()
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import tempfile
+from fractions import Fraction
+
+# Bump when a derivation or the stored layout changes, older entries are then ignored
+CACHE_VERSION = 1
+CACHE_DIR = os.environ.get("COOK_TOOM_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "cook_toom"))
+MAX_BYTES = 16 * 1024 * 1024
+
+def cache_key(algorithm, sizes, points):
+    """
+    Content address of a derivation: hash of the algorithm name, the
+    polynomial lengths and the exact evaluation points.
+    """
+    spec = {
+        "algorithm": algorithm,
+        "sizes": [int(s) for s in sizes],
+        "points": [str(Fraction(str(b))) for b in points],
+        "version": CACHE_VERSION,
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+def to_rational_rows(M):
+    # Matrix of exact rationals (sympy, Fraction or int) -> rows of "p/q" strings
+    rows = M.tolist() if hasattr(M, "tolist") else M
+    return [[str(Fraction(str(c))) for c in row] for row in rows]
+
+def from_rational_rows(rows):
+    return [[Fraction(c) for c in row] for row in rows]
+
+def load(algorithm, sizes, points):
+    """
+    Stored payload for a derivation, or None on a miss.
+
+    A hit refreshes the entry's modification time, which is the LRU order
+    used by prune(); on a read-only cache the hit is returned unrefreshed.
+    """
+    path = os.path.join(CACHE_DIR, cache_key(algorithm, sizes, points) + ".json")
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("version") != CACHE_VERSION:
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return entry["payload"]
+
+def store(algorithm, sizes, points, payload):
+    """
+    Write a payload of rational rows and plain JSON values, then prune.
+
+    The file is written next to its final name and renamed, so concurrent
+    runs never read a partial entry. A cache that cannot be written (not a
+    directory, read-only, full) only skips caching: the temporary file is
+    removed and None returned.
+    """
+    path = os.path.join(CACHE_DIR, cache_key(algorithm, sizes, points) + ".json")
+    entry = {"version": CACHE_VERSION, "algorithm": algorithm, "payload": payload}
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    except OSError:
+        return None
+    stored = False
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        stored = True
+    except OSError:
+        pass
+    finally:
+        if not stored:
+            discard(tmp)
+    if not stored:
+        return None
+    prune()
+    return path
+
+def discard(path):
+    # Remove a file that may already be gone or not be removable
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def prune(max_bytes=None):
+    # Drop least recently used entries until the cache fits in max_bytes
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    try:
+        names = [name for name in os.listdir(CACHE_DIR) if name.endswith(".json")]
+    except OSError:
+        return
+    entries = []
+    for name in names:
+        # Entries removed by a concurrent run are skipped
+        try:
+            stat = os.stat(os.path.join(CACHE_DIR, name))
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        discard(os.path.join(CACHE_DIR, name))
+        total -= size
+
+def clear():
+    if os.path.isdir(CACHE_DIR):
+        for name in os.listdir(CACHE_DIR):
+            if name.endswith(".json"):
+                os.remove(os.path.join(CACHE_DIR, name))
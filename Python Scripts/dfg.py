@@ -0,0 +1,262 @@
+import numpy as np
+
+class DFG:
+    """
+    Data-flow graph shared by the analysis scripts.
+
+    Nodes are columnar (names list + exec_time array), edges live in
+    contiguous NumPy arrays src, dst, delay, weight with 0-indexed nodes.
+    Derived views (dense matrices, CSR, adjacency lists, SCCs) are cached
+    and dropped on every write, so a graph is indexed once per session.
+    Node and edge arrays grow by doubling, so building a graph one node or
+    edge at a time stays linear.
+    """
+    __slots__ = ("names", "index", "node_time", "num_edges",
+                 "edge_src", "edge_dst", "edge_delay", "edge_weight", "cache")
+
+    def __init__(self, capacity=16):
+        self.names = []
+        self.index = {}
+        self.node_time = np.zeros(capacity)
+        self.num_edges = 0
+        self.edge_src = np.zeros(capacity, dtype=np.int64)
+        self.edge_dst = np.zeros(capacity, dtype=np.int64)
+        self.edge_delay = np.zeros(capacity, dtype=np.int64)
+        self.edge_weight = np.zeros(capacity)
+        self.cache = {}
+
+    @classmethod
+    def from_edges(cls, n, edges, exec_time=None, one_indexed=True, field="weight"):
+        """
+        Build from the (i, j, value) edge lists used across the scripts.
+
+        field picks whether value is the edge weight (Minimum_Cycle_Mean_Algorithm,
+        df_pipeline) or the number of delays (retiming, folding).
+        """
+        g = cls(capacity=max(len(edges), 1))
+        times = np.zeros(n) if exec_time is None else np.broadcast_to(np.asarray(exec_time, dtype=float), (n,))
+        for i in range(n):
+            g.add_node(str(i + 1) if one_indexed else str(i), times[i])
+
+        arr = np.asarray(edges, dtype=float).reshape(-1, 3)
+        offset = 1 if one_indexed else 0
+        src = arr[:, 0].astype(np.int64) - offset
+        dst = arr[:, 1].astype(np.int64) - offset
+        zeros = np.zeros(len(arr))
+        if field == "weight":
+            g.add_edges(src, dst, zeros.astype(np.int64), arr[:, 2])
+        elif field == "delay":
+            g.add_edges(src, dst, arr[:, 2].astype(np.int64), zeros)
+        else:
+            raise ValueError(f"Unknown field '{field}', expected 'weight' or 'delay'")
+        return g
+
+    @property
+    def num_nodes(self):
+        return len(self.names)
+
+    @property
+    def exec_time(self):
+        return self.node_time[:self.num_nodes]
+
+    @property
+    def src(self):
+        return self.edge_src[:self.num_edges]
+
+    @property
+    def dst(self):
+        return self.edge_dst[:self.num_edges]
+
+    @property
+    def delay(self):
+        return self.edge_delay[:self.num_edges]
+
+    @property
+    def weight(self):
+        return self.edge_weight[:self.num_edges]
+
+    def node_id(self, node):
+        return node if isinstance(node, (int, np.integer)) else self.index[node]
+
+    def add_node(self, name, exec_time=0):
+        if name in self.index:
+            raise ValueError(f"Node '{name}' already exists")
+        n = len(self.names)
+        if n == self.node_time.size:
+            grown = np.zeros(max(2 * n, 1))
+            grown[:n] = self.node_time
+            self.node_time = grown
+        self.node_time[n] = exec_time
+        self.index[name] = n
+        self.names.append(name)
+        self.cache.clear()
+        return self.index[name]
+
+    def set_exec_time(self, node, exec_time):
+        self.node_time[self.node_id(node)] = exec_time
+        self.cache.clear()
+
+    def reserve_edges(self, count):
+        needed = self.num_edges + count
+        if needed <= self.edge_src.size:
+            return
+        size = max(needed, 2 * self.edge_src.size)
+        for attr in ("edge_src", "edge_dst", "edge_delay", "edge_weight"):
+            old = getattr(self, attr)
+            new = np.zeros(size, dtype=old.dtype)
+            new[:self.num_edges] = old[:self.num_edges]
+            setattr(self, attr, new)
+
+    def add_edge(self, source, dest, delay=0, weight=0):
+        self.add_edges([self.node_id(source)], [self.node_id(dest)], [delay], [weight])
+        return self.num_edges - 1
+
+    def add_edges(self, src, dst, delay, weight):
+        src = np.asarray(src, dtype=np.int64)
+        if src.size and (src.min() < 0 or max(src.max(), np.max(dst)) >= self.num_nodes or np.min(dst) < 0):
+            raise ValueError("Edge endpoint is not a node of the graph")
+        self.reserve_edges(src.size)
+        k0, k1 = self.num_edges, self.num_edges + src.size
+        self.edge_src[k0:k1] = src
+        self.edge_dst[k0:k1] = dst
+        self.edge_delay[k0:k1] = delay
+        self.edge_weight[k0:k1] = weight
+        self.num_edges = k1
+        self.cache.clear()
+
+    def set_edge(self, edge, delay=None, weight=None):
+        if delay is not None:
+            self.edge_delay[edge] = delay
+        if weight is not None:
+            self.edge_weight[edge] = weight
+        self.cache.clear()
+
+    def cached(self, key, build):
+        if key not in self.cache:
+            self.cache[key] = build()
+        return self.cache[key]
+
+    def values(self, field):
+        if field == "weight":
+            return self.weight
+        if field == "delay":
+            return self.delay.astype(float)
+        raise ValueError(f"Unknown field '{field}', expected 'weight' or 'delay'")
+
+    def dense_matrix(self, field="weight", fill=np.inf, reduce="min"):
+        """
+        n x n matrix of an edge field, fill where there is no edge.
+
+        Parallel edges are combined with reduce ("min" for shortest-path
+        style matrices, "max" for the longest path matrix). The cached
+        matrix is returned read-only; copy it before editing.
+        """
+        def build():
+            M = np.full((self.num_nodes, self.num_nodes), fill, dtype=float)
+            ufunc = np.minimum if reduce == "min" else np.maximum
+            seen = np.zeros_like(M, dtype=bool)
+            seen[self.src, self.dst] = True
+            M[seen] = np.inf if reduce == "min" else -np.inf
+            ufunc.at(M, (self.src, self.dst), self.values(field))
+            M.setflags(write=False)
+            return M
+        return self.cached(("dense", field, fill, reduce), build)
+
+    def csr(self, by="src"):
+        """
+        (indptr, other, edge_ids) with edges grouped by source (by="src")
+        or by destination (by="dst"); other is the opposite endpoint.
+        """
+        def build():
+            key, other = (self.src, self.dst) if by == "src" else (self.dst, self.src)
+            order = np.argsort(key, kind="stable")
+            indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(key, minlength=self.num_nodes), out=indptr[1:])
+            return indptr, other[order], order
+        return self.cached(("csr", by), build)
+
+    def adjacency_lists(self):
+        def build():
+            indptr, succ, _ = self.csr("src")
+            return [succ[indptr[v]:indptr[v + 1]].tolist() for v in range(self.num_nodes)]
+        return self.cached("adjacency", build)
+
+    def sccs(self):
+        # 0-indexed components from the Tarjan pass below
+        def build():
+            components = strongly_connected_components(self.num_nodes, self.edge_list())
+            return [[v - 1 for v in component] for component in components]
+        return self.cached("sccs", build)
+
+    def edge_list(self, field="weight", one_indexed=True):
+        offset = 1 if one_indexed else 0
+        values = self.values(field)
+        if field == "delay":
+            values = values.astype(int)
+        return list(zip((self.src + offset).tolist(), (self.dst + offset).tolist(), values.tolist()))
+
+def as_matrix(graph, field="weight", fill=np.inf, reduce="min"):
+    # Pass plain matrices through, turn a DFG into the dense view the caller expects
+    if isinstance(graph, DFG):
+        return graph.dense_matrix(field, fill, reduce)
+    return graph
+
+def as_edge_list(u, edges, field="weight"):
+    # (u, edges) pair for the 1-indexed edge-list scripts, from either form
+    if isinstance(u, DFG):
+        return u.num_nodes, u.edge_list(field)
+    return u, edges
+
+def strongly_connected_components(u, edges):
+
+    # Iterative Tarjan, nodes are 1-indexed like the edge list
+    adj = [[] for _ in range(u + 1)]
+    for i, j, _ in edges:
+        adj[int(i)].append(int(j))
+
+    index = [0] * (u + 1)
+    low = [0] * (u + 1)
+    on_stack = [False] * (u + 1)
+    visited = [False] * (u + 1)
+    stack = []
+    components = []
+    counter = 1
+
+    for root in range(1, u + 1):
+        if visited[root]:
+            continue
+
+        work = [(root, 0)]
+        while work:
+            v, pos = work.pop()
+            if pos == 0:
+                visited[v] = True
+                index[v] = low[v] = counter
+                counter += 1
+                stack.append(v)
+                on_stack[v] = True
+
+            if pos < len(adj[v]):
+                work.append((v, pos + 1))
+                w = adj[v][pos]
+                if not visited[w]:
+                    work.append((w, 0))
+                elif on_stack[w]:
+                    low[v] = min(low[v], index[w])
+                continue
+
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(sorted(component))
+
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[v])
+
+    return components
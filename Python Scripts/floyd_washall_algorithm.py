@@ -1,17 +1,24 @@
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
 import numpy as np
+from dfg import as_matrix
 
-def generate_matrices_fixed_final(R1, n):
+def generate_matrices_fixed_final(R1, n=None):
     """
     Generate matrices R2 to Rn ensuring correct updates, particularly for the last row,
     while printing computation steps.
     
     Parameters:
-    R1 (numpy.ndarray): Initial nxn matrix
-    n (int): Size of the matrix
+    R1 (numpy.ndarray or DFG): Initial nxn matrix, or a DFG for its weight matrix
+    n (int): Size of the matrix, R1's size when omitted
     
     Returns:
     list: List of matrices [R2, R3, ..., Rn]
     """
+    R1 = as_matrix(R1)
+    n = R1.shape[0] if n is None else n
     matrices = [R1.copy()]
 
     for k in range(n):  # Floyd-Warshall iteration over intermediate vertices
@@ -48,23 +55,191 @@ def generate_matrices_fixed_final(R1, n):
 
     return matrices[1:n+1]
 
-# Define the input matrix
-inf = np.inf
-n = 4
-R1 = np.array([
-    [inf, inf, 10, 22],
-    [9, inf, inf, inf],
-    [inf, -2, inf, inf],
-    [inf, -2, inf, inf]
-])
-
-# Generate matrices R2 to Rn with final correction
-result_matrices_fixed_final = generate_matrices_fixed_final(R1, n)
-
-# Print all matrices
-for i, matrix in enumerate(result_matrices_fixed_final, start=2):
-    print(f"Matrix R{i}:")
-    for row in matrix:
+class FloydTrace:
+    """
+    Records only the cells that change, as (k, u, v, old, new) diffs.
+    """
+    def __init__(self):
+        self.k = []
+        self.u = []
+        self.v = []
+        self.old = []
+        self.new = []
+
+    def record(self, k, rows, cols, old, new):
+        self.k.append(np.full(rows.size, k))
+        self.u.append(rows)
+        self.v.append(cols)
+        self.old.append(old)
+        self.new.append(new)
+
+    def diffs(self):
+        if not self.k:
+            return [np.array([], dtype=int)] * 3 + [np.array([])] * 2
+        return [np.concatenate(col) for col in (self.k, self.u, self.v, self.old, self.new)]
+
+    def print_updates(self):
+        for k, u, v, old, new in zip(*self.diffs()):
+            print(f"Updating R{k+2}[{u},{v}] from {old} to {new}")
+
+def floyd_warshall_inplace(R1, trace=None, block_size=32):
+    """
+    Floyd-Warshall on a single matrix, one vectorised np.minimum per k.
+
+    Rows are relaxed in blocks through a reused buffer, so memory stays at
+    O(n^2) in total and nothing is printed unless a trace is requested.
+
+    Parameters:
+    R1 (numpy.ndarray): Initial nxn matrix (np.inf where there is no edge)
+    trace (FloydTrace): Optional recorder for the per-cell updates
+    block_size (int): Rows relaxed per np.minimum call
+
+    Returns:
+    numpy.ndarray: Final matrix, equal to the last matrix of generate_matrices_fixed_final
+    """
+    D = np.array(as_matrix(R1), dtype=float)
+    n = D.shape[0]
+    buf = np.empty((min(block_size, n), n))
+
+    for k in range(n):
+        # Row/column k as they were before this step, like the copying version
+        row = D[k].copy()
+        col = D[:, k].copy()
+
+        if trace is not None:
+            via_k = col[:, None] + row[None, :]
+            rows, cols = np.nonzero(via_k < D)
+            trace.record(k, rows, cols, D[rows, cols], via_k[rows, cols])
+            D[rows, cols] = via_k[rows, cols]
+            continue
+
+        for i0 in range(0, n, block_size):
+            i1 = min(i0 + block_size, n)
+            via_k = buf[:i1 - i0]
+            np.add(col[i0:i1, None], row, out=via_k)
+            np.minimum(D[i0:i1], via_k, out=D[i0:i1])
+
+    return D
+
+def blocked_infinity(dtype):
+    # Integer tiles have no inf, use a value that cannot overflow when doubled
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.integer):
+        return np.iinfo(dtype).max // 2
+    return np.inf
+
+def relax_tile(C, A_col, B_row, big):
+    # C = min(C, A_col + B_row) without letting "no path" become finite
+    via_k = A_col[:, None] + B_row[None, :]
+    if big != np.inf:
+        via_k[(A_col[:, None] >= big) | (B_row[None, :] >= big)] = big
+    np.minimum(C, via_k, out=C)
+
+def floyd_warshall_tile(C, A, B, big):
+    # Relax C through every k of the pivot tile, C may alias A or B
+    for k in range(A.shape[1]):
+        relax_tile(C, A[:, k].copy(), B[k, :].copy(), big)
+
+def floyd_warshall_blocked(R1, path, tile=256, dtype=np.float64):
+    """
+    Three-phase blocked Floyd-Warshall over an np.memmap, one tile at a time.
+
+    Only a few tile x tile blocks are held in memory, so the matrix itself
+    may be larger than RAM. For integer dtypes np.inf is stored as
+    blocked_infinity(dtype). The caller owns the file at path; use
+    floyd_warshall_blocked_tempdir for a result that is removed afterwards.
+
+    Parameters:
+    R1 (numpy.ndarray): Initial nxn matrix, may itself be an np.memmap
+    path (str): File backing the result
+    tile (int): Tile edge length
+    dtype: Storage dtype, e.g. np.float32 or np.int32
+
+    Returns:
+    numpy.memmap: Final matrix, the S matrix of the in-memory path
+    """
+    R1 = as_matrix(R1)
+    n = R1.shape[0]
+    D = np.memmap(path, dtype=dtype, mode="w+", shape=(n, n))
+    blocked_passes(R1, D, tile, blocked_infinity(dtype))
+    D.flush()
+    return D
+
+@contextmanager
+def floyd_warshall_blocked_tempdir(R1, tile=256, dtype=np.float64, dir=None):
+    """
+    floyd_warshall_blocked backed by a file in a temporary directory.
+
+    Yields the np.memmap; the directory and the file are removed when the
+    with block ends, so the memmap must not be used after it. Nothing is
+    copied into memory.
+    """
+    with tempfile.TemporaryDirectory(dir=dir) as tmp:
+        D = floyd_warshall_blocked(R1, os.path.join(tmp, "floyd_warshall.dat"), tile, dtype)
+        try:
+            yield D
+        finally:
+            del D
+
+def blocked_passes(R1, D, tile, big):
+    # Copy R1 into D and run the three phases for every pivot tile, in place
+    n = R1.shape[0]
+    for i0 in range(0, n, tile):
+        block = np.asarray(R1[i0:i0 + tile], dtype=float)
+        D[i0:i0 + tile] = np.where(np.isinf(block), big, block)
+
+    bounds = [(b, min(b + tile, n)) for b in range(0, n, tile)]
+
+    for k0, k1 in bounds:
+        # Phase 1: pivot tile
+        pivot = np.array(D[k0:k1, k0:k1])
+        floyd_warshall_tile(pivot, pivot, pivot, big)
+        D[k0:k1, k0:k1] = pivot
+
+        # Phase 2: pivot row and pivot column
+        for j0, j1 in bounds:
+            if j0 == k0:
+                continue
+            row_tile = np.array(D[k0:k1, j0:j1])
+            floyd_warshall_tile(row_tile, pivot, row_tile, big)
+            D[k0:k1, j0:j1] = row_tile
+
+            col_tile = np.array(D[j0:j1, k0:k1])
+            floyd_warshall_tile(col_tile, col_tile, pivot, big)
+            D[j0:j1, k0:k1] = col_tile
+
+        # Phase 3: every remaining tile through the finished row/column
+        for i0, i1 in bounds:
+            if i0 == k0:
+                continue
+            col_tile = np.array(D[i0:i1, k0:k1])
+            for j0, j1 in bounds:
+                if j0 == k0:
+                    continue
+                C = np.array(D[i0:i1, j0:j1])
+                floyd_warshall_tile(C, col_tile, np.array(D[k0:k1, j0:j1]), big)
+                D[i0:i1, j0:j1] = C
+
+if __name__ == "__main__":
+    # Define the input matrix
+    inf = np.inf
+    n = 4
+    R1 = np.array([
+        [inf, inf, 10, 22],
+        [9, inf, inf, inf],
+        [inf, -2, inf, inf],
+        [inf, -2, inf, inf]
+    ])
+
+    # In-place engine; --trace prints every cell update of every step
+    trace = FloydTrace() if "--trace" in sys.argv else None
+    S = floyd_warshall_inplace(R1, trace=trace)
+    if trace is not None:
+        trace.print_updates()
+        print()
+
+    print(f"Matrix R{n + 1}:")
+    for row in S:
         print("[" + ", ".join(["inf" if val == np.inf else str(int(val)) if val == int(val) else f"{val:.1f}" for val in row]) + "]")
     print()
 
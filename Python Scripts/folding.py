@@ -1,3 +1,5 @@
+import numpy as np
+
 class Node:
     def __init__(self, name, label, p):
         self.name = name
@@ -9,21 +11,80 @@ class DFGraph:
         self.nodes = {}
         self.edges = []  # (source, dest, W)
         self.N = folding_factor
+        self.arrays = None  # cached (W, offset) edge arrays
+
+    @classmethod
+    def from_dfg(cls, graph, folding_factor, labels, p=None):
+        # Folding view of a shared DFG, p defaults to the node execution times
+        g = cls(folding_factor)
+        p = graph.exec_time if p is None else p
+        for v, name in enumerate(graph.names):
+            g.add_node(name, labels[v], int(p[v]))
+        for s, d, w in zip(graph.src, graph.dst, graph.delay):
+            g.add_edge(graph.names[s], graph.names[d], int(w))
+        return g
 
     def add_node(self, name, label, p):
         self.nodes[name] = Node(name, label, p)
+        self.arrays = None
 
     def add_edge(self, source, dest, W):
         self.edges.append((source, dest, W))
+        self.arrays = None
+
+    def edge_arrays(self):
+        """
+        Per-edge W and the N-independent part label(V) - label(U) - p(U).
+
+        Edges touching an undefined node get NaN so they never crash a batch.
+        """
+        if self.arrays is None:
+            W = np.array([w for _, _, w in self.edges], dtype=float)
+            offset = np.full(len(self.edges), np.nan)
+            for e, (source, dest, _) in enumerate(self.edges):
+                u_node = self.nodes.get(source)
+                v_node = self.nodes.get(dest)
+                if u_node is not None and v_node is not None:
+                    offset[e] = v_node.label - u_node.label - u_node.p
+            self.arrays = (W, offset)
+        return self.arrays
+
+    def folding_delays(self, N=None):
+        # D_F(U→V) for every edge at once, NaN where a node is undefined
+        W, offset = self.edge_arrays()
+        return (self.N if N is None else N) * W + offset
+
+    def folding_delay_table(self, N_values):
+        # (len(N_values) x edges) table of D_F for a folding-factor sweep
+        W, offset = self.edge_arrays()
+        N_values = np.asarray(N_values, dtype=float)
+        return N_values[:, None] * W[None, :] + offset[None, :]
+
+    def undefined_edges(self):
+        return np.flatnonzero(np.isnan(self.edge_arrays()[1]))
+
+    def infeasible_edges(self, N=None):
+        # Negative D_F means the folding set cannot be realised for this N
+        with np.errstate(invalid="ignore"):
+            return np.flatnonzero(self.folding_delays(N) < 0)
+
+    def feasible_folding_factors(self, N_values):
+        # Folding factors for which every defined edge has D_F >= 0 (see undefined_edges)
+        table = self.folding_delay_table(N_values)
+        ok = np.all(np.isnan(table) | (table >= 0), axis=1)
+        return [int(N) for N in np.asarray(N_values)[ok]]
 
     def compute_DF(self):
+        DF = self.folding_delays()
         print(f"{'Source':<6} → {'Dest':<6} | {'DF':>4}")
         print("-" * 30)
-        for source, dest, W in self.edges:
-            u_node = self.nodes[source]
-            v_node = self.nodes[dest]
-            DF = (self.N * W) + v_node.label - u_node.label - u_node.p
-            print(f"{source:<6} → {dest:<6} | {DF:>4}")
+        for (source, dest, _), value in zip(self.edges, DF):
+            if np.isnan(value):
+                print(f"{source:<6} → {dest:<6} | {'n/a':>4}  (undefined node)")
+            elif value < 0:
+                print(f"{source:<6} → {dest:<6} | {int(value):>4}  (infeasible)")
+            else:
+                print(f"{source:<6} → {dest:<6} | {int(value):>4}")
 
 # ------------- Example ------------- #
 if __name__ == "__main__":
@@ -66,4 +127,6 @@ if __name__ == "__main__":
 
 
 
-    g.compute_DF()
\ No newline at end of file
+    g.compute_DF()
+    print(f"\n{len(g.undefined_edges())} edge(s) reference undefined nodes")
+    print(f"Feasible folding factors in 1..16: {g.feasible_folding_factors(range(1, 17))}")
\ No newline at end of file
@@ -0,0 +1,226 @@
+import heapq
+import re
+import numpy as np
+from folding import DFGraph
+
+def default_op_type(name):
+    # "A3" -> "A", "M12" -> "M": operation type from the name prefix
+    match = re.match(r"[A-Za-z_]+", name)
+    return match.group(0) if match else name
+
+class SlotTable:
+    """
+    Per-type occupancy of hardware units over the N time partitions.
+
+    occupant[unit, slot] holds the node index scheduled there (-1 when free),
+    so free-slot lookups and swaps are O(1) array operations.
+    """
+    def __init__(self, num_units, N):
+        self.occupant = np.full((num_units, N), -1, dtype=np.int64)
+
+    def first_free(self, lo, hi):
+        # Earliest slot in [lo, hi] with a free unit, as (unit, slot) or None
+        if lo > hi:
+            return None
+        free = self.occupant[:, lo:hi + 1] == -1
+        slots = np.flatnonzero(free.any(axis=0))
+        if slots.size == 0:
+            return None
+        slot = lo + slots[0]
+        return int(np.argmax(self.occupant[:, slot] == -1)), int(slot)
+
+def schedule_folding(graph, N=None, op_types=None, units=None, max_passes=50, candidate_slots=4):
+    """
+    Assign every node of a DFGraph to a hardware unit and time partition.
+
+    List scheduling along the zero-delay precedence order places each node
+    in the earliest slot allowed by D_F(U→V) = N*W + v - u - P_U >= 0, then
+    a local search moves or swaps nodes to remove any remaining negative
+    D_F. Node labels in the graph are updated in place.
+
+    Parameters:
+    graph (DFGraph): Graph to fold, node p values are the pipelining levels
+    N (int): Folding factor (graph.N if None)
+    op_types (dict): Node name -> operation type (name prefix if None)
+    units (dict): Operation type -> number of units (ceil(count / N) if None)
+    max_passes (int): Local search passes over the violating nodes
+    candidate_slots (int): Cheapest slots tried per node in a pass
+
+    Returns:
+    tuple: ({name: (unit, slot)}, number of edges with negative D_F)
+    """
+    N = graph.N if N is None else N
+    graph.N = N
+    names = list(graph.nodes)
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    op_types = op_types or {}
+    node_type = [op_types.get(name, default_op_type(name)) for name in names]
+    p = np.array([graph.nodes[name].p for name in names])
+
+    counts = {}
+    for t in node_type:
+        counts[t] = counts.get(t, 0) + 1
+    units = dict(units or {})
+    for t, count in counts.items():
+        units.setdefault(t, -(-count // N))
+        if units[t] * N < count:
+            raise ValueError(f"{units[t]} unit(s) of type '{t}' cannot hold {count} operations with N={N}")
+    tables = {t: SlotTable(units[t], N) for t in counts}
+
+    # Edges between defined nodes as arrays
+    defined = [(index[s], index[d], w) for s, d, w in graph.edges if s in index and d in index]
+    src = np.array([e[0] for e in defined], dtype=np.int64)
+    dst = np.array([e[1] for e in defined], dtype=np.int64)
+    W = np.array([e[2] for e in defined], dtype=np.int64)
+    incident = [[] for _ in range(n)]
+    for e, (s, d, _) in enumerate(defined):
+        incident[s].append(e)
+        if d != s:
+            incident[d].append(e)
+
+    # Priority: longest zero-delay path to a sink, scheduled in topological order
+    zero_succ = [[] for _ in range(n)]
+    indegree = np.zeros(n, dtype=np.int64)
+    for s, d, w in defined:
+        if w == 0 and s != d:
+            zero_succ[s].append(d)
+            indegree[d] += 1
+    order = []
+    remaining_in = indegree.copy()
+    ready = [v for v in range(n) if remaining_in[v] == 0]
+    while ready:
+        v = ready.pop()
+        order.append(v)
+        for d in zero_succ[v]:
+            remaining_in[d] -= 1
+            if remaining_in[d] == 0:
+                ready.append(d)
+    height = p.astype(float)
+    for v in reversed(order):
+        for d in zero_succ[v]:
+            height[v] = max(height[v], p[v] + height[d])
+
+    # List order: ready node with the longest remaining path first
+    pending = []
+    remaining_in = indegree.copy()
+    heap = [(-height[v], v) for v in range(n) if remaining_in[v] == 0]
+    heapq.heapify(heap)
+    while heap:
+        _, v = heapq.heappop(heap)
+        pending.append(v)
+        for d in zero_succ[v]:
+            remaining_in[d] -= 1
+            if remaining_in[d] == 0:
+                heapq.heappush(heap, (-height[d], d))
+    # Nodes on zero-delay cycles never become ready, schedule them last
+    placed = set(pending)
+    pending += [v for v in range(n) if v not in placed]
+
+    label = np.full(n, -1, dtype=np.int64)
+    unit = np.full(n, -1, dtype=np.int64)
+
+    for v in pending:
+        lo, hi = 0, N - 1
+        for e in incident[v]:
+            if src[e] == v and dst[e] != v and label[dst[e]] >= 0:
+                hi = min(hi, label[dst[e]] + N * W[e] - p[v])
+            if dst[e] == v and src[e] != v and label[src[e]] >= 0:
+                lo = max(lo, label[src[e]] + p[src[e]] - N * W[e])
+        table = tables[node_type[v]]
+        place = table.first_free(max(lo, 0), min(hi, N - 1)) or table.first_free(0, N - 1)
+        unit[v], label[v] = place
+        table.occupant[place] = v
+
+    def violation(edge_ids):
+        e = np.asarray(edge_ids, dtype=np.int64)
+        DF = N * W[e] + label[dst[e]] - label[src[e]] - p[src[e]]
+        return int(np.maximum(-DF, 0).sum())
+
+    def slot_costs(v):
+        # Violation on v's edges for every slot v could take, others fixed
+        slots = np.arange(N)[:, None]
+        e = np.asarray(incident[v], dtype=np.int64)
+        lab_src = np.where(src[e] == v, slots, label[src[e]])
+        lab_dst = np.where(dst[e] == v, slots, label[dst[e]])
+        DF = N * W[e] + lab_dst - lab_src - p[src[e]]
+        return np.maximum(-DF, 0).sum(axis=1)
+
+    # Local search: move v to a free unit or swap it with an occupant of a cheaper slot
+    for _ in range(max_passes):
+        if src.size == 0:
+            break
+        DF = N * W + label[dst] - label[src] - p[src]
+        if not (DF < 0).any():
+            break
+        bad = np.unique(np.concatenate([src[DF < 0], dst[DF < 0]]))
+        improved = False
+
+        for v in bad:
+            table = tables[node_type[v]]
+            home = (unit[v], label[v])
+            costs = slot_costs(v)
+            best_delta, best_place = 0, None
+
+            for slot in np.argsort(costs, kind="stable")[:candidate_slots]:
+                if costs[slot] >= costs[home[1]]:
+                    break
+                free = np.flatnonzero(table.occupant[:, slot] == -1)
+                if free.size:
+                    delta = costs[slot] - costs[home[1]]
+                    if delta < best_delta:
+                        best_delta, best_place = delta, (int(free[0]), int(slot))
+                    continue
+
+                for k, other in enumerate(table.occupant[:, slot]):
+                    touched = incident[v] + incident[other]
+                    before = violation(touched)
+                    label[v], label[other] = slot, home[1]
+                    after = violation(touched)
+                    label[v], label[other] = home[1], slot
+                    if after - before < best_delta:
+                        best_delta, best_place = after - before, (k, int(slot))
+
+            if best_place is not None:
+                other = table.occupant[best_place]
+                table.occupant[best_place] = v
+                table.occupant[home] = other
+                if other >= 0:
+                    unit[other], label[other] = home
+                unit[v], label[v] = best_place
+                improved = True
+
+        if not improved:
+            break
+
+    for v, name in enumerate(names):
+        graph.nodes[name].label = int(label[v])
+    graph.arrays = None
+
+    assignment = {name: (f"{node_type[v]}{unit[v]}", int(label[v])) for v, name in enumerate(names)}
+    DF = N * W + label[dst] - label[src] - p[src]
+    return assignment, int(np.count_nonzero(DF < 0))
+
+# ------------- Example ------------- #
+if __name__ == "__main__":
+    # Biquad-style DFG: adders 1-4 (1 stage), multipliers 5-8 (2 stages)
+    g = DFGraph(4)
+    for name in ("A1", "A2", "A3", "A4"):
+        g.add_node(name, 0, 1)
+    for name in ("M5", "M6", "M7", "M8"):
+        g.add_node(name, 0, 2)
+
+    for source, dest, W in [
+        ("A1", "A2", 1), ("A1", "M5", 1), ("A1", "M6", 1), ("A1", "M7", 1),
+        ("A1", "M8", 2), ("A3", "A1", 0), ("M5", "A3", 0), ("M6", "A4", 1),
+        ("M7", "A3", 1), ("M8", "A4", 1), ("A4", "A1", 0),
+    ]:
+        g.add_edge(source, dest, W)
+
+    assignment, violations = schedule_folding(g)
+    print(f"{'Node':<6} | {'Unit':<5} | {'Slot':>4}")
+    print("-" * 22)
+    for name, (hw, slot) in assignment.items():
+        print(f"{name:<6} | {hw:<5} | {slot:>4}")
+    print(f"\nEdges with negative D_F: {violations}\n")
+    g.compute_DF()
@@ -1,8 +1,48 @@
+from math import lcm
 import numpy as np
-from sympy import symbols, simplify, expand, Matrix, Rational
+from sympy import symbols, Matrix, Rational
 import sympy as sp
+import derivation_cache
+from vandermonde import modified_vandermonde_inverse
 
-def modified_toom_cook(l, m, beta_values=None):
+def rational_entry(value):
+    # Cached "p/q" -> plain int when integral (as the derivation builds them), sympy Rational otherwise
+    value = Rational(value)
+    return int(value) if value.is_Integer else value
+
+def load_modified(l, m, eval_points):
+    # Result dict of modified_toom_cook from the on-disk cache, None on a miss
+    payload = derivation_cache.load("modified_toom_cook", (l, m), eval_points)
+    if payload is None:
+        return None
+    h_coeffs = symbols(f'h0:{m}')
+    weights = derivation_cache.from_rational_rows(payload['h_weights'])
+    h_matrix = np.zeros((len(weights), len(weights)), dtype=object)
+    for i, row in enumerate(weights):
+        h_matrix[i, i] = sum(Rational(w.numerator, w.denominator) * h for w, h in zip(row, h_coeffs))
+    return {
+        'postprocessing': np.array([[Rational(c) for c in row] for row in payload['postprocessing']], dtype=object),
+        'h_matrix': h_matrix,
+        'x_transform': np.array([[rational_entry(c) for c in row] for row in payload['x_transform']], dtype=object),
+        'x_input': np.array(symbols(f'x0:{l}'), dtype=object).reshape(l, 1),
+        'eval_points': eval_points,
+        'scaling_factor': Rational(payload['scaling_factor'])
+    }
+
+def store_modified(l, m, eval_points, result):
+    # h_matrix diagonal stored as rational weights on h_0..h_{m-1}
+    scale = result['scaling_factor']
+    weights = [[Rational(beta) ** j / scale for j in range(m)] for beta in eval_points]
+    weights.append([0] * (m - 1) + [Rational(1) / scale])
+    payload = {
+        'postprocessing': derivation_cache.to_rational_rows(result['postprocessing']),
+        'x_transform': derivation_cache.to_rational_rows(result['x_transform']),
+        'h_weights': derivation_cache.to_rational_rows(weights),
+        'scaling_factor': str(scale),
+    }
+    derivation_cache.store("modified_toom_cook", (l, m), eval_points, payload)
+
+def modified_toom_cook(l, m, beta_values=None, cache=True):
     """
     Implements the modified Toom-Cook algorithm for fast convolution with correctly
     structured matrices
@@ -10,41 +50,33 @@ def modified_toom_cook(l, m, beta_values=None):
     Parameters:
     l, m: dimensions of the polynomials (l-1 and m-1 are the degrees)
     beta_values: evaluation points (defaults to [0, -1, -2, ...] if not provided)
+    cache: load from / save to the on-disk derivation cache
     
     Returns:
     Reorganized matrices for the algorithm
     """
     
+    if beta_values is None:
+        beta_values = [-k for k in range(l + m - 2)]
+
     # Ensure we have enough evaluation points
     if len(beta_values) < l+m-2:
         raise ValueError(f"Need at least {l+m-2} beta values for {l}x{m} convolution")
     
     # Create symbolic variables for polynomials
-    p = symbols('p')
     x_coeffs = symbols(f'x0:{l}')
     h_coeffs = symbols(f'h0:{m}')
     
-    # Define the input polynomials
-    x_poly = sum(x_coeffs[i] * p**i for i in range(l))
-    h_poly = sum(h_coeffs[i] * p**i for i in range(m))
-    
-    # Product polynomial degree
-    product_degree = l + m - 1
-    
     # Evaluation points
     eval_points = beta_values[:l+m-2]
+    if cache:
+        cached = load_modified(l, m, eval_points)
+        if cached is not None:
+            return cached
     
-    # Create evaluations of polynomials at beta points
-    x_evals = []
-    h_evals = []
-    for beta in eval_points:
-        x_val = x_poly.subs(p, beta)
-        h_val = h_poly.subs(p, beta)
-        x_evals.append(x_val)
-        h_evals.append(h_val)
-    
-    # Create the highest-degree term of the product
-    highest_term = x_coeffs[l-1] * h_coeffs[m-1]
+    # h(β_i) for every evaluation point, summed directly rather than
+    # substituted into a symbolic polynomial
+    h_evals = [sp.Add(*[h_coeffs[j] * beta ** j for j in range(m)]) for beta in eval_points]
     
     # Step 1: Construct the X transform matrix
     # Maps x coefficients to evaluations at beta points + highest coefficient
@@ -73,59 +105,23 @@ def modified_toom_cook(l, m, beta_values=None):
     # Step 3: Construct the postprocessing matrix
     # We need to map from evaluations to coefficients
     
-    # First, create the Vandermonde matrix for the evaluation points
-    vander = np.zeros((len(eval_points) + 1, product_degree), dtype=object)
-    
-    # Fill rows for evaluation points
-    for i, beta in enumerate(eval_points):
-        for j in range(product_degree):
-            if j < product_degree:
-                vander[i, j] = beta ** j
-    
-    # Add a row for the highest term
-    vander[-1, -1] = 1
-    
-    # Convert to sympy matrix for inversion and exact arithmetic
-    vander_sp = Matrix(vander)
-    
-    # Calculate the postprocessing matrix (inverse of Vandermonde)
-    # We'll try to find an integer representation
-    try:
-        # Compute the raw inverse
-        raw_postproc = vander_sp.inv()
-        
-        # Convert to integers if possible by scaling
-        lcm_list = []
-        for i in range(raw_postproc.rows):
-            for j in range(raw_postproc.cols):
-                elem = raw_postproc[i, j]
-                if elem.is_Rational:
-                    lcm_list.append(elem.q)  # denominator
-        
-        if lcm_list:
-            # Find the LCM of all denominators
-            from sympy import lcm
-            scaling_factor = 1
-            for denom in lcm_list:
-                scaling_factor = lcm(scaling_factor, denom)
-            
-            # Scale the postprocessing matrix to get integers
-            postproc = raw_postproc * scaling_factor
-            
-            # Scale the h-matrix by the inverse to maintain correctness
-            for i in range(h_matrix.shape[0]):
-                for j in range(h_matrix.shape[1]):
-                    if h_matrix[i, j] != 0:
-                        h_matrix[i, j] = h_matrix[i, j] / scaling_factor
-        else:
-            postproc = raw_postproc
-            scaling_factor = 1
-    except:
-        # Fall back to numerical approximation if exact inversion fails
-        postproc = Matrix(np.linalg.pinv(vander.astype(float)))
-        scaling_factor = 1
-    
-    return {
+    # The inverse of the Vandermonde matrix (rows β_i^j plus one selecting the
+    # highest coefficient) comes exactly from the Lagrange basis in O(n²)
+    raw_postproc = modified_vandermonde_inverse(eval_points)
+
+    # Scale by the LCM of the denominators to get integers
+    scaling_factor = sp.Integer(lcm(*[c.denominator for row in raw_postproc for c in row]))
+    postproc = Matrix([[Rational(c.numerator, c.denominator) * scaling_factor for c in row]
+                       for row in raw_postproc])
+
+    # Scale the h-matrix by the inverse to maintain correctness
+    if scaling_factor != 1:
+        for i in range(h_matrix.shape[0]):
+            for j in range(h_matrix.shape[1]):
+                if h_matrix[i, j] != 0:
+                    h_matrix[i, j] = h_matrix[i, j] / scaling_factor
+    
+    result = {
         'postprocessing': np.array(postproc),
         'h_matrix': h_matrix,
         'x_transform': x_transform,
@@ -133,6 +129,9 @@ def modified_toom_cook(l, m, beta_values=None):
         'eval_points': eval_points,
         'scaling_factor': scaling_factor
     }
+    if cache:
+        store_modified(l, m, eval_points, result)
+    return result
 
 def format_matrix(matrix):
     """Format matrix elements for better display"""
@@ -198,15 +197,16 @@ def print_matrices(result, l, m):
     print(f"\nTotal additions: postprocessing={postproc_adds}, x_transform={x_trans_adds}")
     print(f"Total multiplications: {len(result['eval_points']) + 1}")  # Number of point evaluations + highest term
 
-# Example for 2x2 convolution with β₀ = 0, β₁ = -1
-print("=========== 2x2 Convolution Example ============")
-result_2x2 = modified_toom_cook(2, 2, [0, -1])
-print_matrices(result_2x2, 2, 2)
+def run_examples():
+    # Example for 2x2 convolution with β₀ = 0, β₁ = -1
+    print("=========== 2x2 Convolution Example ============")
+    result_2x2 = modified_toom_cook(2, 2, [0, -1])
+    print_matrices(result_2x2, 2, 2)
 
-# Example for 3x3 convolution 
-print("\n\n=========== 3x3 Convolution Example ============")
-result_3x3 = modified_toom_cook(3, 3, [0, 1, -1, 2])
-print_matrices(result_3x3, 3, 3)
+    # Example for 3x3 convolution 
+    print("\n\n=========== 3x3 Convolution Example ============")
+    result_3x3 = modified_toom_cook(3, 3, [0, 1, -1, 2])
+    print_matrices(result_3x3, 3, 3)
 
 def run_custom():
     try:
@@ -227,6 +227,7 @@ def run_custom():
         print(f"Error: {e}")
 
 if __name__ == "__main__":
+    run_examples()
     print("\nWould you like to try a custom configuration?")
     response = input("Enter 'y' for yes, any other key to exit: ")
     if response.lower() == 'y':
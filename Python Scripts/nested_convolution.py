@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+import argparse
+import numpy as np
+from cook_toom_engine import default_points, exact_matrices, integer_rows
+
+def matrix_additions(M):
+    # Same rule as modified_cook_toom.count_additions: a row with k nonzeros costs k-1 additions
+    return int(np.maximum(np.count_nonzero(M, axis=1) - 1, 0).sum())
+
+class SmallConvolution:
+    """
+    One n×n fast convolution as integer matrices:
+    s = G · diag(B_h·h) · B · x / scale.
+
+    kind="cook_toom" uses cook_toom.derive_matrices on 2n-1 points,
+    kind="modified" uses modified_toom_cook on 2n-2 points plus the
+    highest coefficient, which keeps the points smaller.
+    """
+    def __init__(self, n, kind="cook_toom"):
+        self.n, self.kind = n, kind
+        if kind == "cook_toom":
+            B, B_h, G_int, g_scale = exact_matrices(n, n, default_points(2 * n - 1))
+        elif kind == "modified":
+            from modified_cook_toom import modified_toom_cook
+            points = [int(b) if b.denominator == 1 else b for b in default_points(2 * n - 2)]
+            result = modified_toom_cook(n, n, points)
+            B = B_h = result['x_transform']
+            G_int, g_scale = result['postprocessing'], result['scaling_factor']
+        else:
+            raise ValueError(f"Unknown kind '{kind}', expected 'cook_toom' or 'modified'")
+
+        self.B, b_scale = integer_rows(B)
+        self.B_h, h_scale = integer_rows(B_h)
+        self.G, _ = integer_rows(G_int)
+        self.scale = int(g_scale) * b_scale * h_scale
+        self.multiplications = self.B.shape[0]
+
+def apply_on_axis(T, M, axis):
+    # Multiply every vector of T along axis by M
+    return np.moveaxis(np.tensordot(M, T, axes=([1], [axis])), 0, axis)
+
+class NestedConvolution:
+    """
+    Iterated fast convolution of two length-n sequences, n = n_1·n_2·...·n_k.
+
+    Writing x(p) = Σ X_j(p) q^j with q = p^(n_1) turns the n×n convolution
+    into an n_2·...·n_k sized convolution whose coefficients are n_1-point
+    polynomials, so the small algorithms nest: pre-additions and
+    post-additions are applied level by level along the axes of the
+    reshaped block, the pointwise products are the product of the levels'
+    multiplication counts, and the partial products are overlap-added.
+
+    Parameters:
+    sizes (list): Level sizes n_1 (innermost) .. n_k
+    kind (str): "cook_toom" or "modified" small algorithms
+    """
+    def __init__(self, sizes, kind="cook_toom"):
+        self.sizes = list(sizes)
+        if not self.sizes:
+            raise ValueError("NestedConvolution needs at least one level size")
+        self.levels = [SmallConvolution(n, kind) for n in self.sizes]
+        self.n = int(np.prod(self.sizes))
+        self.scale = int(np.prod([level.scale for level in self.levels], dtype=object))
+
+    def blocks(self, X):
+        # (batch, n) -> (batch, n_k, ..., n_1)
+        return np.asarray(X).reshape((-1,) + tuple(reversed(self.sizes)))
+
+    def transform(self, T, attr):
+        for i, level in enumerate(self.levels):
+            T = apply_on_axis(T, getattr(level, attr), T.ndim - 1 - i)
+        return T
+
+    def overlap_add(self, S):
+        """
+        (batch, 2n_k-1, ..., 2n_1-1) partial products -> (batch, 2n-1).
+
+        Levels are merged from the inside out: coefficient a of level i
+        lands at offset a·(n_1·...·n_(i-1)) of the merged inner sequence.
+        """
+        stride = self.sizes[0]
+        for n in self.sizes[1:]:
+            inner = S.shape[-1]
+            merged = np.zeros(S.shape[:-2] + ((2 * n - 2) * stride + inner,), dtype=S.dtype)
+            for a in range(2 * n - 1):
+                merged[..., a * stride:a * stride + inner] += S[..., a, :]
+            S = merged
+            stride *= n
+        return S
+
+    def transform_filter(self, h):
+        return self.transform(self.blocks(h), "B_h")[0]
+
+    def magnitude_bound(self, X, h):
+        # Upper bound on any intermediate value from the largest absolute row sums
+        norm = lambda attr: int(np.prod([np.abs(getattr(level, attr)).sum(axis=1).max() for level in self.levels], dtype=object))
+        x_max = int(np.abs(X).max(initial=0))
+        h_max = int(np.abs(h).max(initial=0))
+        overlaps = int(np.prod([2 * n - 1 for n in self.sizes]))
+        return x_max * h_max * norm("B") * norm("B_h") * norm("G") * overlaps
+
+    def convolve(self, X, h):
+        """
+        Linear convolution of every row of X (batch, L) with h (N,), L, N <= n.
+
+        Shorter inputs are zero-padded to n and the output is trimmed.
+
+        Returns:
+        array: (batch, L + N - 1), integer when X and h are integer
+        """
+        X, h = np.atleast_2d(X), np.asarray(h)
+        length = X.shape[1] + h.size - 1
+        if X.shape[1] > self.n or h.size > self.n:
+            raise ValueError(f"Inputs longer than the {self.n}-point nested convolution")
+        X = np.pad(X, ((0, 0), (0, self.n - X.shape[1])))
+        h = np.pad(h, (0, self.n - h.size))
+        exact = np.issubdtype(X.dtype, np.integer) and np.issubdtype(h.dtype, np.integer)
+        if not exact:
+            X, h = X.astype(float), h.astype(float)
+
+        if exact and max(self.magnitude_bound(X, h), self.scale) >= 2 ** 62:
+            # Exact result needs more than int64: fall back to Python integers
+            X, h = X.astype(object), h.astype(object)
+
+        V = self.transform(self.blocks(X), "B") * self.transform_filter(h)
+        out = self.overlap_add(self.transform(V, "G"))[:, :length]
+        if not exact:
+            return out / self.scale
+        # The convolution itself fits in int64 even when the intermediates did not
+        return (out // self.scale).astype(np.int64)
+
+    def operation_counts(self):
+        """
+        Per-block multiplications and additions.
+
+        Additions are counted the order convolve() applies the levels: the
+        matrix of level i runs once per vector along its axis, with the
+        already transformed axes at their new size. The filter transform is
+        precomputed and not counted.
+        """
+        sizes = [level.n for level in self.levels]
+        mults = [level.multiplications for level in self.levels]
+        outs = [2 * n - 1 for n in sizes]
+
+        pre = post = 0
+        for i, level in enumerate(self.levels):
+            pre += int(np.prod(mults[:i]) * np.prod(sizes[i + 1:])) * matrix_additions(level.B)
+            post += int(np.prod(outs[:i]) * np.prod(mults[i + 1:])) * matrix_additions(level.G)
+        overlap = int(np.prod(outs)) - (2 * self.n - 1)
+
+        return {
+            "multiplications": int(np.prod(mults)),
+            "pre_additions": pre,
+            "post_additions": post,
+            "overlap_additions": overlap,
+            "additions": pre + post + overlap,
+            "direct_multiplications": self.n ** 2,
+            "direct_additions": (self.n - 1) ** 2,
+        }
+
+def plan_sizes(n, factors=(2, 3, 4)):
+    """
+    Level sizes from factors whose product covers n with the fewest
+    multiplications (ties broken by the smaller padded length). At least
+    one level is planned, so n = 1 gets the smallest factor.
+    """
+    if n < 1:
+        raise ValueError(f"Convolution length must be at least 1, got {n}")
+    best = None
+    def search(chosen, length, mults):
+        nonlocal best
+        if chosen and length >= n:
+            key = (mults, length)
+            if best is None or key < best[0]:
+                best = (key, list(chosen))
+            return
+        for f in factors:
+            if chosen and f < chosen[-1]:
+                continue
+            chosen.append(f)
+            search(chosen, length * f, mults * (2 * f - 1))
+            chosen.pop()
+    search([], 1, 1)
+    return best[1]
+
+def print_counts(nested):
+    counts = nested.operation_counts()
+    print(f"Levels {nested.sizes} -> {nested.n}×{nested.n} convolution")
+    print(f"  multiplications: {counts['multiplications']:>7} (direct {counts['direct_multiplications']})")
+    print(f"  additions:       {counts['additions']:>7} (direct {counts['direct_additions']}; "
+          f"pre {counts['pre_additions']}, post {counts['post_additions']}, overlap {counts['overlap_additions']})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nested Cook–Toom convolution")
+    parser.add_argument('--sizes', type=int, nargs='+', help="level sizes, innermost first (planned if omitted)")
+    parser.add_argument('--taps', type=int, nargs='+', default=[16, 64, 256], help="filter lengths to plan for")
+    parser.add_argument('--kind', choices=("cook_toom", "modified"), default="cook_toom")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for plan in ([args.sizes] if args.sizes else [plan_sizes(n) for n in args.taps]):
+        nested = NestedConvolution(plan, args.kind)
+        print_counts(nested)
+        x = rng.integers(-8, 8, (4, nested.n))
+        h = rng.integers(-8, 8, nested.n)
+        exact = all(np.array_equal(y, np.convolve(row, h)) for y, row in zip(nested.convolve(x, h), x))
+        print(f"  matches np.convolve: {exact}\n")
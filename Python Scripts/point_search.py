@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from itertools import combinations, islice
+from math import lcm
+from vandermonde import master_polynomial, modified_vandermonde_inverse
+
+OBJECTIVES = ("pre_additions", "post_additions", "multiplications", "magnitude")
+
+def candidate_values(max_int=3, max_den=3):
+    # 0, ±1..±max_int and ±1/2..±1/max_den, smallest magnitudes first
+    values = {Fraction(0)}
+    for k in range(1, max_int + 1):
+        values |= {Fraction(k), Fraction(-k)}
+    for k in range(2, max_den + 1):
+        values |= {Fraction(1, k), Fraction(-1, k)}
+    return sorted(values, key=lambda b: (max(abs(b.numerator), b.denominator), b < 0, b))
+
+def nonzero(row):
+    return sum(1 for c in row if c != 0)
+
+def row_additions(M):
+    # count_additions rule: a row with k nonzeros costs k-1 additions
+    return sum(max(nonzero(row) - 1, 0) for row in M)
+
+def constant_multiplications(M):
+    return sum(1 for row in M for c in row if c not in (0, 1, -1))
+
+def size(c):
+    return max(abs(c.numerator), c.denominator)
+
+def pre_matrix(points, l):
+    # x_transform of modified_toom_cook: β_i^j rows plus the highest coefficient
+    return [[b ** j for j in range(l)] for b in points] + [[Fraction(0)] * (l - 1) + [Fraction(1)]]
+
+def lower_bound(points, l, m):
+    """
+    Lower bounds of the score without inverting, used to prune sets.
+
+    The pre-addition matrix is exact. The post-processing matrix's last
+    column is scale·P with P = Π (p - β) from the cached master polynomial,
+    and scale·P_k is a multiple of P_k's numerator, which bounds the
+    magnitude and the constant multiplications. Its row n-1 holds the
+    nonzero 1/P'(β_i), and row 0 is dense when 0 is not a point.
+    """
+    pre = pre_matrix(points, l)
+    P = master_polynomial(tuple(points))
+    n = len(points)
+    post_additions = max(n - 1, 0) + (n if n > 1 and 0 not in points else 0)
+    return {
+        "pre_additions": row_additions(pre),
+        "post_additions": post_additions,
+        "multiplications": l + m - 1 + constant_multiplications(pre) + sum(1 for c in P if abs(c.numerator) > 1),
+        "magnitude": max(max(size(c) for row in pre for c in row), max(abs(c.numerator) for c in P)),
+    }
+
+def score_points(points, l, m):
+    """
+    Cost of the modified l×m Toom–Cook algorithm on the given points.
+
+    The post-processing matrix is the exact inverse of the interpolation
+    matrix scaled to integers, as modified_toom_cook builds it. Costs are
+    additions per matrix, general plus constant (not 0/±1) multiplications
+    and the largest numerator or denominator in either matrix.
+    """
+    pre = pre_matrix(points, l)
+    inverse = modified_vandermonde_inverse(points)
+    scale = lcm(*[c.denominator for row in inverse for c in row])
+    post = [[c * scale for c in row] for row in inverse]
+    return {
+        "points": [str(b) for b in points],
+        "scaling_factor": scale,
+        "pre_additions": row_additions(pre),
+        "post_additions": row_additions(post),
+        "multiplications": l + m - 1 + constant_multiplications(pre) + constant_multiplications(post),
+        "magnitude": max(size(c) for matrix in (pre, post) for row in matrix for c in row),
+    }
+
+def covers(a, b):
+    # a is at least as good as b everywhere: b adds nothing to a front holding a
+    return all(a[k] <= b[k] for k in OBJECTIVES)
+
+def dominates(a, b):
+    return covers(a, b) and any(a[k] < b[k] for k in OBJECTIVES)
+
+def pareto_front(scores):
+    # One set per distinct non-dominated cost vector, first found kept
+    front = []
+    for s in scores:
+        if any(covers(f, s) for f in front):
+            continue
+        front = [f for f in front if not dominates(s, f)] + [s]
+    return front
+
+def score_chunk(args):
+    """
+    Pool worker: Pareto front of one chunk of point sets.
+
+    Sets arrive in combination order, so consecutive sets share prefixes
+    and the cached master polynomials of vandermonde are reused. A set is
+    skipped when it breaks max_magnitude or a front member already covers
+    its lower_bound().
+    """
+    point_sets, l, m, max_magnitude = args
+    front, pruned = [], 0
+    for points in point_sets:
+        bound = lower_bound(points, l, m)
+        if bound["magnitude"] > max_magnitude or any(covers(f, bound) for f in front):
+            pruned += 1
+            continue
+        s = score_points(points, l, m)
+        if s["magnitude"] <= max_magnitude:
+            front = pareto_front(front + [s])
+    return front, pruned
+
+def canonical(points):
+    # β and -β give mirrored algorithms with equal cost, keep one of each pair
+    return tuple(sorted(points)) <= tuple(sorted(-b for b in points))
+
+def search_points(l, m, values=None, max_magnitude=None, max_workers=None, chunk_size=256):
+    """
+    Pareto front of evaluation point sets for a modified l×m Toom–Cook.
+
+    Parameters:
+    l, m (int): Polynomial lengths, l+m-2 points are chosen
+    values (list): Candidate points (candidate_values() if None)
+    max_magnitude (int): Sets with a larger coefficient are discarded (no limit if None)
+    max_workers (int): Process pool size (os default if None)
+    chunk_size (int): Point sets per pool task
+
+    Returns:
+    tuple: (front sorted by objectives, {"sets": enumerated, "pruned": skipped before inverting})
+    """
+    values = candidate_values() if values is None else [Fraction(v) for v in values]
+    max_magnitude = float("inf") if max_magnitude is None else max_magnitude
+    n = l + m - 2
+    sets = (points for points in combinations(values, n) if canonical(points))
+    tasks = []
+    while True:
+        chunk = list(islice(sets, chunk_size))
+        if not chunk:
+            break
+        tasks.append((chunk, l, m, max_magnitude))
+
+    front, pruned = [], 0
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for chunk_front, chunk_pruned in pool.map(score_chunk, tasks):
+            front = pareto_front(front + chunk_front)
+            pruned += chunk_pruned
+    total = sum(len(task[0]) for task in tasks)
+    return sorted(front, key=lambda s: tuple(s[k] for k in OBJECTIVES)), {"sets": total, "pruned": pruned}
+
+def print_front(front):
+    print(f"{'points':<36} | {'pre+':>4} | {'post+':>5} | {'mult':>4} | {'max coef':>8} | {'scale':>6}")
+    print("-" * 78)
+    for s in front:
+        points = ", ".join(s["points"])
+        print(f"{points:<36} | {s['pre_additions']:>4} | {s['post_additions']:>5} | "
+              f"{s['multiplications']:>4} | {s['magnitude']:>8} | {s['scaling_factor']:>6}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search β points for modified Toom–Cook")
+    parser.add_argument('l', type=int)
+    parser.add_argument('m', type=int)
+    parser.add_argument('--max-int', type=int, default=3, help="largest integer point")
+    parser.add_argument('--max-den', type=int, default=3, help="largest denominator of ±1/k points")
+    parser.add_argument('--max-magnitude', type=int, help="discard sets with larger coefficients")
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    front, stats = search_points(args.l, args.m, candidate_values(args.max_int, args.max_den),
+                                 args.max_magnitude, args.workers)
+    print(f"{stats['sets']} point sets, {stats['pruned']} pruned, {len(front)} on the Pareto front\n")
+    print_front(front)
@@ -0,0 +1,149 @@
+import numpy as np
+from folding import DFGraph
+
+def variable_lifetimes(graph):
+    """
+    Lifetime of every node output in a folded DFGraph.
+
+    The output of U is produced at Tin = u + P_U and last read at
+    Tout = Tin + max D_F(U→V); it needs a register during Tin+1 .. Tout.
+    Edges touching undefined nodes are skipped.
+
+    Returns:
+    tuple: (names, Tin, Tout) with Tin/Tout as int arrays
+    """
+    DF = graph.folding_delays()
+    longest = {}
+    for (source, _, _), value in zip(graph.edges, DF):
+        if not np.isnan(value):
+            longest[source] = max(longest.get(source, 0), int(value))
+
+    names = list(longest)
+    Tin = np.array([graph.nodes[name].label + graph.nodes[name].p for name in names], dtype=np.int64)
+    Tout = Tin + np.array([longest[name] for name in names], dtype=np.int64)
+    return names, Tin, Tout
+
+class LifetimeIndex:
+    """
+    Lifetimes sorted by start time for fast live-variable queries.
+
+    A variable with (Tin, Tout) is live at cycles Tin < t <= Tout. Queries
+    only scan the starts within the longest lifetime before t.
+    """
+    def __init__(self, names, Tin, Tout):
+        order = np.argsort(Tin, kind="stable")
+        self.names = [names[i] for i in order]
+        self.Tin = np.asarray(Tin)[order]
+        self.Tout = np.asarray(Tout)[order]
+        self.longest = int((self.Tout - self.Tin).max()) if len(order) else 0
+
+    def live_at(self, t):
+        # Indices (into the sorted order) of the variables live at cycle t
+        lo = np.searchsorted(self.Tin, t - self.longest, side="left")
+        hi = np.searchsorted(self.Tin, t, side="left")
+        window = np.arange(lo, hi)
+        return window[self.Tout[window] >= t]
+
+    def live_counts(self, N):
+        """
+        Live variables per time step of a period-N schedule.
+
+        One sweep over the sorted +1/-1 events gives the live count on every
+        segment between events; segments are then folded onto the N residues.
+        """
+        counts = np.zeros(N, dtype=np.int64)
+        if len(self.Tin) == 0:
+            return counts
+
+        times = np.concatenate([self.Tin + 1, self.Tout + 1])
+        steps = np.concatenate([np.ones(len(self.Tin), dtype=np.int64), -np.ones(len(self.Tin), dtype=np.int64)])
+        order = np.argsort(times, kind="stable")
+        times, live = times[order], np.cumsum(steps[order])
+
+        # Segment [a, b) holds c variables: c per full period, then a wrapped remainder
+        a, length, c = times[:-1], np.diff(times), live[:-1]
+        full, rest = np.divmod(length, N)
+        counts += int((c * full).sum())
+
+        start = a % N
+        end = start + rest
+        diff = np.zeros(N + 1, dtype=np.int64)
+        np.add.at(diff, start, c)
+        np.add.at(diff, np.minimum(end, N), -c)
+        wrapped = end > N
+        np.add.at(diff, np.zeros(wrapped.sum(), dtype=np.int64), c[wrapped])
+        np.add.at(diff, end[wrapped] - N, -c[wrapped])
+        counts += np.cumsum(diff)[:N]
+        return counts
+
+def min_registers(graph):
+    names, Tin, Tout = variable_lifetimes(graph)
+    return int(LifetimeIndex(names, Tin, Tout).live_counts(graph.N).max(initial=0))
+
+def forward_backward_allocation(graph):
+    """
+    Forward-backward register allocation for a folded DFGraph.
+
+    Variables enter at the start of their lifetime (longest lifetime first on
+    ties), move forward one register per cycle and, on reaching the last
+    register while still live, go back to the first free register. The
+    schedule is periodic, so a slot taken at cycle t is taken at t mod N.
+
+    Returns:
+    tuple: (table, K) with table[t][r] the variable in register r at step t
+    """
+    N = graph.N
+    names, Tin, Tout = variable_lifetimes(graph)
+    index = LifetimeIndex(names, Tin, Tout)
+    K = int(index.live_counts(N).max(initial=0))
+    occupant = [[None] * K for _ in range(N)]
+
+    order = sorted(range(len(index.names)), key=lambda v: (index.Tin[v], -(index.Tout[v] - index.Tin[v])))
+    for v in order:
+        name = index.names[v]
+        reg = None
+        for t in range(index.Tin[v] + 1, index.Tout[v] + 1):
+            row = occupant[t % N]
+            forward = 0 if reg is None else reg + 1
+            if forward < K and row[forward] is None:
+                reg = forward
+            else:
+                reg = row.index(None)
+            row[reg] = name
+
+    return occupant, K
+
+def print_allocation(table, K):
+    header = " | ".join(f"R{r + 1:<3}" for r in range(K))
+    print(f"{'Cycle':<5} | {header}")
+    print("-" * (8 + 7 * K))
+    for t, row in enumerate(table):
+        cells = " | ".join(f"{name or '':<4}" for name in row)
+        print(f"{t:<5} | {cells}")
+
+# ------------- Example ------------- #
+if __name__ == "__main__":
+    from folding_scheduler import schedule_folding
+
+    g = DFGraph(4)
+    for name in ("A1", "A2", "A3", "A4"):
+        g.add_node(name, 0, 1)
+    for name in ("M5", "M6", "M7", "M8"):
+        g.add_node(name, 0, 2)
+    for source, dest, W in [
+        ("A1", "A2", 1), ("A1", "M5", 1), ("A1", "M6", 1), ("A1", "M7", 1),
+        ("A1", "M8", 2), ("A3", "A1", 0), ("M5", "A3", 0), ("M6", "A4", 1),
+        ("M7", "A3", 1), ("M8", "A4", 1), ("A4", "A1", 0),
+    ]:
+        g.add_edge(source, dest, W)
+    schedule_folding(g)
+
+    names, Tin, Tout = variable_lifetimes(g)
+    print(f"{'Var':<5} | {'Tin':>3} | {'Tout':>4}")
+    print("-" * 18)
+    for name, a, b in zip(names, Tin, Tout):
+        print(f"{name:<5} | {a:>3} | {b:>4}")
+
+    table, K = forward_backward_allocation(g)
+    print(f"\nMinimum registers: {K}\n")
+    print_allocation(table, K)
@@ -1,6 +1,9 @@
+import argparse
+import functools
+import heapq
+import operator
+import time
 import numpy as np
-import pandas as pd
-from itertools import combinations
 
 binary_coeffs = [
     "11101111",
@@ -13,67 +16,150 @@ binary_coeffs = [
     "00010001"
     ]
 
-max_len = max(len(b) for b in binary_coeffs)
-padded_binary = [b.zfill(max_len) for b in binary_coeffs]
-A = np.array([[int(bit) for bit in row] for row in padded_binary])
-
-iteration = 1
-while True:
-    print(f"\nIteration {iteration}\n")
-    all_groups = []
-
-    # Step 1: Find all row groups with ≥2 shared 1s
-    for r in range(2, A.shape[0] + 1):
-        for rows in combinations(range(A.shape[0]), r):
-            subset = A[list(rows)]
-            common_ones = np.sum(np.all(subset == 1, axis=0))
-            if common_ones >= 2:
-                all_groups.append((rows, common_ones))
-
-    if not all_groups:
-        break
-
-    # Step 2: Pick the group with the most rows
-    max_row_count = max(len(g[0]) for g in all_groups)
-    best_groups = [g[0] for g in all_groups if len(g[0]) == max_row_count]
-
-    print("Group with max rows that share ≥2 ones:")
-    for group in best_groups:
-        print(group)
-        subset = A[list(group)]
-        shared_positions = np.where(np.all(subset == 1, axis=0))[0]
-        print(f"Shared positions: {shared_positions.tolist()}")
-
-        print("Subset used for XOR:")
-        print(subset)
-
-        # Compute Pn from XOR
-        Pn = np.bitwise_xor.reduce(subset, axis=0)
-        print(f"Pn vector: {Pn.tolist()}")
-
-        # Zero out shared 1s in group rows
-        shared_mask = np.zeros(A.shape[1], dtype=bool)
-        shared_mask[shared_positions] = True
-        for idx in group:
-            if not np.any(A[idx]):
-                continue
-            A[idx, shared_mask] = 0
-
-        # ✅ Create new P column with 1s for participating rows
-        pn_col = np.zeros((A.shape[0],), dtype=int)
-        for idx in group:
-            pn_col[idx] = 1
-        A = np.hstack((A, pn_col.reshape(-1, 1)))
-        break  # process only one group per iteration
-
-    print("Matrix after iteration:")
-    print(A)
-    iteration += 1
-
-# Final matrix output
-print("\nFinal matrix\n")
-num_input_bits = max_len
-num_outputs = A.shape[1] - num_input_bits
-column_names = [f"X{i}" for i in range(num_input_bits)] + [f"P{i+1}" for i in range(num_outputs)]
-df = pd.DataFrame(A, columns=column_names)
-print(df)
\ No newline at end of file
+def coefficient_matrix(binary_coeffs):
+    # One row per coefficient, bits left-padded to a common width
+    max_len = max(len(b) for b in binary_coeffs)
+    padded_binary = [b.zfill(max_len) for b in binary_coeffs]
+    return np.array([[int(bit) for bit in row] for row in padded_binary])
+
+def row_indices(mask):
+    # Set bits of a bitmask, lowest first
+    return tuple(i for i in range(mask.bit_length()) if mask >> i & 1)
+
+def bit_matrix(rows, width):
+    # Row bitmasks (bit j = column j) -> 0/1 matrix
+    return np.array([[row >> j & 1 for j in range(width)] for row in rows])
+
+class PairIndex:
+    """
+    Rows sharing each pair of columns, with a heap of the largest groups.
+
+    A set of rows shares at least two 1s exactly when every row has both
+    columns of some pair, so the largest such group is the largest row set
+    of a column pair, ties going to the lexicographically first rows as
+    combinations() would list them. Row sets are bitmasks (bit i = row i)
+    and counted with popcount. Heap entries go stale when a pair changes
+    and are dropped lazily when they reach the top.
+
+    Parameters:
+    columns (list): Row bitmask of every column, updated by the caller
+    """
+    def __init__(self, columns):
+        self.columns = columns
+        self.groups = {}
+        self.heap = []
+        for b in range(len(columns)):
+            for a in range(b):
+                self.update(a, b)
+
+    def update(self, a, b):
+        mask = self.columns[a] & self.columns[b]
+        if mask.bit_count() < 2:
+            self.groups.pop((a, b), None)
+        elif self.groups.get((a, b)) != mask:
+            self.groups[(a, b)] = mask
+            heapq.heappush(self.heap, (-mask.bit_count(), row_indices(mask), a, b, mask))
+
+    def update_column(self, c):
+        # Only the pairs of a changed column can change
+        for other in range(len(self.columns)):
+            if other != c:
+                self.update(min(c, other), max(c, other))
+
+    def best(self):
+        # Largest current group as a row bitmask, None when no two rows share two 1s
+        while self.heap:
+            _, _, a, b, mask = self.heap[0]
+            if self.groups.get((a, b)) == mask:
+                return mask
+            heapq.heappop(self.heap)
+        return None
+
+def share_subexpressions(A, verbose=True):
+    """
+    Repeatedly factor out the largest row group sharing at least two 1s.
+
+    Each iteration clears the shared bits in the group rows and appends a
+    P column marking the rows that now use the shared term. Rows and
+    columns are kept as integer bitmasks: the shared bits of a group are
+    the AND of its rows, and the candidate groups live in a PairIndex that
+    is updated only for the columns an extraction touched.
+
+    Parameters:
+    A (array): 0/1 coefficient matrix, one row per coefficient
+    verbose (bool): Print every iteration
+
+    Returns:
+    array: The final matrix, input bit columns followed by P columns
+    """
+    A = np.asarray(A)
+    width = A.shape[1]
+    rows = [sum(1 << int(j) for j in np.flatnonzero(row)) for row in A]
+    columns = [sum(1 << int(i) for i in np.flatnonzero(col)) for col in A.T]
+    index = PairIndex(columns)
+
+    iteration = 1
+    while True:
+        if verbose:
+            print(f"\nIteration {iteration}\n")
+        group = index.best()
+        if group is None:
+            break
+        members = row_indices(group)
+        shared = functools.reduce(operator.and_, (rows[i] for i in members))
+
+        if verbose:
+            print("Group with max rows that share ≥2 ones:")
+            print(members)
+            print(f"Shared positions: {list(row_indices(shared))}")
+            print("Subset used for XOR:")
+            print(bit_matrix([rows[i] for i in members], width))
+            pn = functools.reduce(operator.xor, (rows[i] for i in members))
+            print(f"Pn vector: {[pn >> j & 1 for j in range(width)]}")
+
+        # Zero out shared 1s in group rows and add the P column of the group
+        for i in members:
+            rows[i] = rows[i] & ~shared | 1 << width
+        for j in row_indices(shared):
+            columns[j] &= ~group
+        columns.append(group)
+        width += 1
+        for j in row_indices(shared) + (width - 1,):
+            index.update_column(j)
+
+        if verbose:
+            print("Matrix after iteration:")
+            print(bit_matrix(rows, width))
+        iteration += 1
+    return bit_matrix(rows, width)
+
+def print_final_matrix(A, num_input_bits):
+    import pandas as pd
+
+    print("\nFinal matrix\n")
+    num_outputs = A.shape[1] - num_input_bits
+    column_names = [f"X{i}" for i in range(num_input_bits)] + [f"P{i+1}" for i in range(num_outputs)]
+    df = pd.DataFrame(A, columns=column_names)
+    print(df)
+
+def random_coeffs(taps, bits, seed=0):
+    # Nonzero random coefficients as binary strings, for sizing runs
+    rng = np.random.default_rng(seed)
+    return [format(int(v), f"0{bits}b") for v in rng.integers(1, 2 ** bits, taps)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Subexpression sharing of binary coefficients")
+    parser.add_argument('--random', type=int, metavar="TAPS", help="random coefficients instead of the example")
+    parser.add_argument('--bits', type=int, default=16, help="bits per random coefficient")
+    parser.add_argument('--quiet', action='store_true', help="only print the final matrix")
+    args = parser.parse_args()
+
+    coeffs = random_coeffs(args.random, args.bits) if args.random else binary_coeffs
+    A = coefficient_matrix(coeffs)
+    start = time.perf_counter()
+    shared = share_subexpressions(A, verbose=not args.quiet)
+    if args.random:
+        print(f"\n{A.sum()} ones -> {shared.sum()} with {shared.shape[1] - A.shape[1]} shared terms "
+              f"in {time.perf_counter() - start:.2f} s")
+    else:
+        print_final_matrix(shared, max(len(b) for b in coeffs))
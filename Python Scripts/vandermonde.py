@@ -0,0 +1,71 @@
+from fractions import Fraction
+from functools import lru_cache
+
+@lru_cache(maxsize=4096)
+def master_polynomial(points):
+    """
+    Coefficients (lowest degree first) of P(p) = Π (p - β) over a tuple of points.
+
+    Built on the cached polynomial of points[:-1], so point sets sharing a
+    prefix (consecutive combinations in a search) share the work.
+    """
+    if not points:
+        return (Fraction(1),)
+    prev = master_polynomial(points[:-1])
+    b = points[-1]
+    out = [Fraction(0)] * (len(prev) + 1)
+    for k, c in enumerate(prev):
+        out[k + 1] += c
+        out[k] -= b * c
+    return tuple(out)
+
+def lagrange_coefficients(points):
+    """
+    Coefficients of every Lagrange basis polynomial ℓ_i of the points, O(n²).
+
+    ℓ_i = P(p) / ((p - β_i) · P'(β_i)): one synthetic division and one
+    Horner evaluation per point.
+
+    Returns:
+    list: rows[i][k] = coefficient of p^k in ℓ_i, as Fractions
+    """
+    points = tuple(Fraction(b) for b in points)
+    if len(set(points)) != len(points):
+        raise ValueError("Evaluation points must be distinct")
+    P = master_polynomial(points)
+    n = len(points)
+    rows = []
+    for b in points:
+        q = [Fraction(0)] * n
+        if n:
+            q[n - 1] = P[n]
+        for k in range(n - 1, 0, -1):
+            q[k - 1] = P[k] + b * q[k]
+        # P'(β_i) = Π_{j≠i} (β_i - β_j) = quotient evaluated at β_i
+        denom = Fraction(0)
+        for c in reversed(q):
+            denom = denom * b + c
+        rows.append([c / denom for c in q])
+    return rows
+
+def vandermonde_inverse(points):
+    # Exact inverse of V[i][j] = β_i^j: column i holds the coefficients of ℓ_i
+    rows = lagrange_coefficients(points)
+    n = len(rows)
+    return [[rows[i][k] for i in range(n)] for k in range(n)]
+
+def modified_vandermonde_inverse(points):
+    """
+    Exact inverse of the modified Toom–Cook interpolation matrix.
+
+    Rows β_i^0 .. β_i^n for the n points plus a last row selecting the
+    highest coefficient. Subtracting s_n·p^n leaves a degree n-1 polynomial
+    interpolated by the ℓ_i, and the last column works out to the
+    coefficients of P(p) itself.
+    """
+    points = tuple(Fraction(b) for b in points)
+    rows = lagrange_coefficients(points)
+    n = len(points)
+    inverse = [[rows[i][k] for i in range(n)] + [master_polynomial(points)[k]] for k in range(n)]
+    inverse.append([Fraction(0)] * n + [Fraction(1)])
+    return inverse
@@ -1,8 +1,18 @@
-from math import inf
-from itertools import combinations
+import os
+import random
+import sys
+from itertools import combinations, product
 from collections import defaultdict
+import numpy as np
 
-def create_adjacency_matrix(u, edges):
+if __name__ == "__main__":
+    # Run as a script: the shared DFG model lives in Python Scripts. Importers
+    # put that directory on their own path.
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Python Scripts"))
+from dfg import DFG, as_edge_list
+
+def create_adjacency_matrix(u, edges=None):
+    u, edges = as_edge_list(u, edges)
     adj = [[0] * u for _ in range(u)]
     for i, j, _ in edges:
         adj[i-1][j-1] = 1
@@ -62,7 +72,8 @@ def get_subgraph_edges(adj_matrix, component):
                 edges.append((i, j))
     return edges
 
-def find_feedforward_cutsets(u, edges):
+def find_feedforward_cutsets(u, edges=None):
+    u, edges = as_edge_list(u, edges)
     adj_matrix = create_adjacency_matrix(u, edges)
     edge_tuples = [(i+1, j+1) for i in range(u) for j in range(u) if adj_matrix[i][j]]
     cutsets = []
@@ -87,13 +98,351 @@ def find_feedforward_cutsets(u, edges):
     
     return cutsets, subgraphs
 
+class UnionFind:
+    def __init__(self, nodes):
+        self.parent = {v: v for v in nodes}
+
+    def find(self, v):
+        while self.parent[v] != v:
+            self.parent[v] = self.parent[self.parent[v]]
+            v = self.parent[v]
+        return v
+
+    def union(self, root, v):
+        # Keep the DFS root as the representative
+        self.parent[self.find(v)] = self.find(root)
+
+def split_subgraphs(u, roots, kept):
+    # Components of the remaining graph: every absorbed node joins its smallest source
+    uf = UnionFind(range(1, u + 1))
+    smallest_source = {}
+    for i, j in kept:
+        if i < j and j not in roots:
+            smallest_source[j] = min(smallest_source.get(j, i), i)
+    for j, i in smallest_source.items():
+        uf.union(i, j)
+
+    members = defaultdict(list)
+    for v in range(1, u + 1):
+        members[uf.find(v)].append(v)
+    kept_sorted = sorted(kept)
+    return [
+        {'nodes': members[r], 'edges': [(i, j) for i, j in kept_sorted if uf.find(i) == r and uf.find(j) == r]}
+        for r in sorted(roots)
+    ]
+
+def edge_masks(u, edge_tuples):
+    # Bit j of out_mask[i] is set for edge i -> j, forward_mask keeps only j > i
+    out_mask = [0] * (u + 1)
+    for i, j in edge_tuples:
+        out_mask[i] |= 1 << j
+    forward_mask = [out_mask[i] & ~((1 << (i + 1)) - 1) for i in range(u + 1)]
+    return out_mask, forward_mask
+
+def family_heads(u, edge_tuples):
+    """
+    Yield (roots, sources, kept_count, canonical) for every way a cutset can
+    pass the checks of find_feedforward_cutsets, kept_count being the most
+    edges it can keep and canonical whether every source keeps an edge
+    (otherwise the cutsets belong to a family with fewer sources).
+
+    Remaining edges may not have a node that is both tail and head, so all
+    kept edges leave a source, and only 2-3 DFS roots may be left. Every
+    non-root must keep an edge from a smaller source and sources are roots,
+    so a family is fixed by its 2-3 roots (node 1 always is one) and which
+    of them are sources: O(u^2) families, each checked with a few bitmask
+    operations.
+    """
+    out_mask, forward_mask = edge_masks(u, edge_tuples)
+    all_nodes = ((1 << (u + 1)) - 1) & ~1
+    for size in (2, 3):
+        for others in combinations(range(2, u + 1), size - 1):
+            roots = (1,) + others
+            root_mask = sum(1 << r for r in roots)
+            for count in range(len(roots) + 1):
+                for sources in combinations(roots, count):
+                    source_mask = sum(1 << s for s in sources)
+                    covered = 0
+                    for source in sources:
+                        covered |= forward_mask[source]
+                    if all_nodes & ~root_mask & ~covered:
+                        continue
+
+                    # Edges into a non-source root from a smaller source must go
+                    kept_count = 0
+                    canonical = True
+                    for source in sources:
+                        blocked = 0
+                        for q in roots:
+                            if source < q and not (source_mask >> q) & 1:
+                                blocked |= 1 << q
+                        kept = out_mask[source] & ~source_mask & ~blocked
+                        canonical &= kept != 0
+                        kept_count += bin(kept).count("1")
+                    yield roots, sources, kept_count, canonical
+
+def cutset_families(u, edge_tuples):
+    """
+    Yield (roots, sources, absorbing, free) for every feasible family of
+    family_heads, with each non-root's absorbing in-edges (from a smaller
+    source, at least one must stay) and the optional in-edges of every node.
+    """
+    for roots, sources, _, _ in family_heads(u, edge_tuples):
+        root_set = set(roots)
+        source_set = set(sources)
+        absorbing = defaultdict(list)
+        free = defaultdict(list)
+        for i, j in edge_tuples:
+            if i not in source_set or j in source_set:
+                continue
+            if j not in root_set and i < j:
+                absorbing[j].append((i, j))
+            elif i > j:
+                free[j].append((i, j))
+        yield roots, sources, absorbing, free
+
+def nonempty_subsets(items):
+    return [c for r in range(1, len(items) + 1) for c in combinations(items, r)]
+
+def all_subsets(items):
+    return [c for r in range(len(items) + 1) for c in combinations(items, r)]
+
+def iter_feedforward_cutsets(u, edges=None):
+    """
+    Generate the cutsets of find_feedforward_cutsets without trying every
+    edge subset: each family from cutset_families expands to its kept-edge
+    choices directly. Yields (cutset, subgraph_data) family by family.
+    """
+    u, edges = as_edge_list(u, edges)
+    edge_tuples = sorted({(i, j) for i, j, _ in edges})
+    for roots, sources, absorbing, free in cutset_families(u, edge_tuples):
+        choices = [nonempty_subsets(absorbing[v]) for v in absorbing if absorbing[v]]
+        choices += [all_subsets(free[v]) for v in free if free[v]]
+        for picked in product(*choices):
+            kept = {e for group in picked for e in group}
+            # sources without a kept edge belong to the smaller family
+            if {i for i, _ in kept} != set(sources):
+                continue
+            cutset = [e for e in edge_tuples if e not in kept]
+            if cutset:
+                yield cutset, split_subgraphs(u, roots, kept)
+
+def find_feedforward_cutsets_fast(u, edges=None, limit=None):
+    """
+    Same cutsets and subgraphs as find_feedforward_cutsets in polynomial
+    time per family. With limit, stops after that many cutsets (not in the
+    brute-force order); otherwise results are sorted like the brute force.
+    """
+    u, edges = as_edge_list(u, edges)
+    edge_tuples = sorted({(i, j) for i, j, _ in edges})
+    position = {e: k for k, e in enumerate(edge_tuples)}
+    found = []
+    for cutset, subgraph_data in iter_feedforward_cutsets(u, edges):
+        found.append((cutset, subgraph_data))
+        if limit is not None and len(found) >= limit:
+            return [c for c, _ in found], [s for _, s in found]
+
+    found.sort(key=lambda item: (len(item[0]), [position[e] for e in item[0]]))
+    return [c for c, _ in found], [s for _, s in found]
+
+def droppable_edge(kept, root_set):
+    """
+    First kept edge (in edge order) whose removal leaves a valid keep-set:
+    its source keeps another edge, and an absorbing edge (i < j into a
+    non-root) leaves another absorbing edge into j. None if there is none.
+    """
+    out_degree = defaultdict(int)
+    absorbing = defaultdict(int)
+    for i, j in kept:
+        out_degree[i] += 1
+        if j not in root_set and i < j:
+            absorbing[j] += 1
+    for i, j in sorted(kept):
+        if out_degree[i] > 1 and (j in root_set or i > j or absorbing[j] > 1):
+            return (i, j)
+    return None
+
+def best_feedforward_cutset(u, edges=None):
+    """
+    Cutset adding the fewest latches (one per cut edge). Within a family
+    keeping every allowed edge is optimal, unless that keeps every edge of
+    the graph: the cutset would be empty, and the best one drops a single
+    edge instead (droppable_edge). Ties go to the brute-force order.
+    Returns (cutset, subgraph_data) or (None, None).
+    """
+    u, edges = as_edge_list(u, edges)
+    edge_tuples = sorted({(i, j) for i, j, _ in edges})
+    position = {e: k for k, e in enumerate(edge_tuples)}
+    best = None
+    for roots, sources, kept_count, canonical in family_heads(u, edge_tuples):
+        least = max(len(edge_tuples) - kept_count, 1)
+        if not canonical or (best is not None and least > best[0][0]):
+            continue
+        root_set, source_set = set(roots), set(sources)
+        kept = {
+            (i, j) for i, j in edge_tuples
+            if i in source_set and j not in source_set and (j not in root_set or i > j)
+        }
+        if len(kept) == len(edge_tuples):
+            dropped = droppable_edge(kept, root_set)
+            if dropped is None:
+                continue
+            kept.discard(dropped)
+        cutset = [e for e in edge_tuples if e not in kept]
+        key = (len(cutset), [position[e] for e in cutset])
+        if best is None or key < best[0]:
+            best = (key, cutset, split_subgraphs(u, roots, kept))
+    return (best[1], best[2]) if best else (None, None)
+
+def check_against_brute_force(trials=300, max_nodes=5, max_edges=7, seed=0):
+    """
+    Compare find_feedforward_cutsets_fast (every cutset) and
+    best_feedforward_cutset (the first cutset of the brute-force order)
+    with find_feedforward_cutsets on random small graphs, self-loops
+    included. Raises AssertionError on the first mismatch.
+
+    Returns:
+    int: Number of graphs checked
+    """
+    rng = random.Random(seed)
+    for _ in range(trials):
+        u = rng.randint(2, max_nodes)
+        pairs = [(i, j) for i in range(1, u + 1) for j in range(1, u + 1)]
+        edges = [(i, j, 0) for i, j in rng.sample(pairs, rng.randint(1, min(max_edges, len(pairs))))]
+        cutsets, subgraphs = find_feedforward_cutsets(u, edges)
+        assert find_feedforward_cutsets_fast(u, edges) == (cutsets, subgraphs), f"enumeration differs for u={u}, {edges}"
+        expected = (cutsets[0], subgraphs[0]) if cutsets else (None, None)
+        assert best_feedforward_cutset(u, edges) == expected, f"best cutset differs for u={u}, {edges}"
+    return trials
+
+def zero_delay_order(graph):
+    # Kahn's topological order of the zero-delay subgraph, O(V+E)
+    n = graph.num_nodes
+    zero = graph.delay == 0
+    succ = [[] for _ in range(n)]
+    indegree = [0] * n
+    for i, j in zip(graph.src[zero].tolist(), graph.dst[zero].tolist()):
+        succ[i].append(j)
+        indegree[j] += 1
+
+    order = []
+    ready = [v for v in range(n) if indegree[v] == 0]
+    while ready:
+        v = ready.pop()
+        order.append(v)
+        for j in succ[v]:
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                ready.append(j)
+    if len(order) < n:
+        raise ValueError("Zero-delay cycle: the DFG has no valid schedule")
+    return order, succ
+
+def critical_path(graph):
+    """
+    Longest path of the zero-delay subgraph of a DFG by topological DP, O(V+E).
+
+    Returns (length, path, finish): path as 0-indexed nodes, length counts
+    the execution time of every node on it, finish[v] is the latest finish
+    time of v within one iteration.
+    """
+    order, succ = zero_delay_order(graph)
+    exec_time = graph.exec_time.tolist()
+    finish = list(exec_time)
+    parent = [-1] * graph.num_nodes
+    for v in order:
+        for j in succ[v]:
+            if finish[v] + exec_time[j] > finish[j]:
+                finish[j] = finish[v] + exec_time[j]
+                parent[j] = v
+    if not order:
+        return 0.0, [], np.zeros(0)
+
+    v = max(range(graph.num_nodes), key=finish.__getitem__)
+    length = finish[v]
+    path = []
+    while v != -1:
+        path.append(v)
+        v = parent[v]
+    return length, path[::-1], np.array(finish)
+
+def pipeline_levels(graph, width):
+    """
+    Pipeline stage of every node so that no stage holds a zero-delay path
+    longer than width, where loops allow it.
+
+    Levels never decrease along an edge and are equal inside an SCC, so the
+    edges leaving levels 0..k form a feedforward cutset for every k. SCCs
+    are visited in topological order and start in the highest level of
+    their predecessors; an SCC whose zero-delay paths would overrun the
+    width from there moves to the next level (one more cutset).
+    """
+    order, _ = zero_delay_order(graph)
+    position = [0] * graph.num_nodes
+    for k, v in enumerate(order):
+        position[v] = k
+    indptr, pred, edge_ids = graph.csr("dst")
+    indptr, pred = indptr.tolist(), pred.tolist()
+    zero = (graph.delay[edge_ids] == 0).tolist()
+    exec_time = graph.exec_time.tolist()
+
+    component = [0] * graph.num_nodes
+    components = graph.sccs()[::-1]
+    for c, nodes in enumerate(components):
+        for v in nodes:
+            component[v] = c
+
+    level = [0] * graph.num_nodes
+    stage_time = [0.0] * graph.num_nodes
+    for c, nodes in enumerate(components):
+        nodes = sorted(nodes, key=position.__getitem__)
+        entry = max((level[u] for v in nodes for u in pred[indptr[v]:indptr[v + 1]] if component[u] != c), default=0)
+
+        # Zero-delay DP inside the stage; predecessors in earlier stages are behind a latch
+        for L in (entry, entry + 1):
+            for v in nodes:
+                longest = 0.0
+                for k in range(indptr[v], indptr[v + 1]):
+                    u = pred[k]
+                    if zero[k] and level[u] == L and (component[u] == c or L == entry):
+                        longest = max(longest, stage_time[u])
+                level[v] = L
+                stage_time[v] = longest + exec_time[v]
+            if max(stage_time[v] for v in nodes) <= width:
+                break
+
+    return np.array(level, dtype=np.int64)
+
+def pipeline_to_period(graph, target, iteration_bound=None):
+    """
+    Pipeline a DFG with feedforward cutsets until its critical path fits the target.
+
+    Latches go on the edges between the stages of pipeline_levels, one per
+    cutset crossed. Loops are never cut, so the critical path cannot go
+    below what the loops allow; pass the iteration bound to aim no lower.
+    The DFG is edited in place.
+
+    Parameters:
+    graph (DFG): Graph with exec_time and delays
+    target (float): Desired clock period
+    iteration_bound (float): Known iteration bound, optional
+
+    Returns:
+    tuple: (critical path length, latches added per edge, number of cutsets)
+    """
+    goal = target if iteration_bound is None else max(target, iteration_bound)
+    level = pipeline_levels(graph, goal)
+    latches = level[graph.dst] - level[graph.src]
+    graph.set_edge(slice(0, graph.num_edges), delay=graph.delay + latches)
+    return critical_path(graph)[0], latches, int(level.max(initial=0))
+
 def print_subgraph(subgraph, index):
     print(f"\nSubgraph {index}:")
     print(f"Nodes: {subgraph['nodes']}")
     print(f"Edges: {subgraph['edges']}")
 
 def main():
-    u = 3  # nodes 
+    u = 4  # nodes 
     v = 4  # links
     edges = [
         (1, 2, 0),
@@ -107,7 +456,7 @@ def main():
     print("Original graph edges:", edges)
     print("\nFinding feed forward cutsets that create 2 or 3 subgraphs...")
     
-    cutsets, subgraphs = find_feedforward_cutsets(u, edges)
+    cutsets, subgraphs = find_feedforward_cutsets_fast(u, edges)
     
     if cutsets:
         print("\nFound feed forward cutsets and their resulting subgraphs:")
@@ -122,6 +471,25 @@ def main():
     else:
         print("\nNo valid feed forward cutsets found that create 2 or 3 subgraphs.")
 
+    best, _ = best_feedforward_cutset(u, edges)
+    if best:
+        print(f"\nBest cutset ({len(best)} latches): {best}")
+
+    # Direct-form 4-tap FIR: multipliers M1-M4 (2 u.t.) into the adder chain A1-A3 (1 u.t.)
+    fir = DFG()
+    for name, time in [("M1", 2), ("M2", 2), ("M3", 2), ("M4", 2), ("A1", 1), ("A2", 1), ("A3", 1)]:
+        fir.add_node(name, time)
+    for source, dest in [("M1", "A1"), ("M2", "A1"), ("A1", "A2"), ("M3", "A2"), ("A2", "A3"), ("M4", "A3")]:
+        fir.add_edge(source, dest)
+
+    length, path, _ = critical_path(fir)
+    print(f"\nFIR critical path: {' -> '.join(fir.names[v] for v in path)} ({length:g} u.t.)")
+    period, latches, cutsets = pipeline_to_period(fir, 3)
+    print(f"Pipelined with {cutsets} cutset(s), {latches.sum()} latch(es): critical path {period:g} u.t.")
+
 if __name__ == "__main__":
-    main()
+    if "--check" in sys.argv:
+        print(f"Fast and best cutsets match the brute force on {check_against_brute_force()} random graphs")
+    else:
+        main()
     
\ No newline at end of file
@@ -41,7 +41,8 @@ def explain_matrix_calculation(L1: np.ndarray):
     print(L3)
 
 # Example usage
-L1 = np.array([[-1, 3],
-               [3, -1]])
+if __name__ == "__main__":
+    L1 = np.array([[-1, 3],
+                   [3, -1]])
 
-explain_matrix_calculation(L1)
\ No newline at end of file
+    explain_matrix_calculation(L1)
\ No newline at end of file